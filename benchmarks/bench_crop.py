@@ -0,0 +1,377 @@
+"""
+Parity checks and benchmarks for the image crop nodes.
+
+Usage: python benchmarks/bench_crop.py
+"""
+
+import hashlib
+import math
+import multiprocessing
+import resource
+import time
+
+import torch
+import torch.nn.functional as F
+
+import comfy_stubs
+
+comfy_stubs.install()
+
+import comfy.utils
+import jps_nodes
+
+def make_images(batch, height, width, seed=0):
+    # 8-bit values, so the PIL path gets the same input as the torch path
+    generator = torch.Generator().manual_seed(seed)
+    return (torch.rand(batch, 3, height, width, generator=generator) * 255).round() / 255
+
+def timed(function, repeat=3):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+def check_lanczos_parity(tolerance=1.5 / 255):
+    """
+    Compares lanczos_resize with comfy.utils.lanczos for upscaling, downscaling and mixed resizes.
+    The PIL path rounds to 8 bits after every pass, so differences of about one step are expected.
+    """
+    print("lanczos parity with comfy.utils.lanczos")
+    cases = (((48, 80), (120, 200)), ((64, 64), (40, 40)), ((90, 50), (33, 71)), ((200, 300), (50, 75)), ((64, 64), (64, 160)), ((37, 41), (37, 41)))
+    for (height, width), (new_height, new_width) in cases:
+        images = make_images(2, height, width)
+        difference = (comfy.utils.lanczos(images, new_width, new_height) - jps_nodes.lanczos_resize(images, new_width, new_height)).abs()
+        print(f"  {width}x{height} -> {new_width}x{new_height}: max {difference.max().item() * 255:.2f}/255, mean {difference.mean().item() * 255:.3f}/255")
+        assert difference.max().item() <= tolerance
+
+def bench_lanczos(batch=8):
+    """
+    Compares the throughput of the PIL round trip with the torch resampler on whole batches.
+    """
+    print(f"lanczos throughput, batch of {batch}")
+    for (height, width), (new_height, new_width) in (((1024, 1024), (224, 224)), ((768, 1344), (1024, 1792)), ((512, 512), (1536, 1536))):
+        images = make_images(batch, height, width)
+        pil_seconds, _ = timed(lambda: comfy.utils.lanczos(images, new_width, new_height))
+        torch_seconds, _ = timed(lambda: jps_nodes.lanczos_resize(images, new_width, new_height))
+        print(f"  {width}x{height} -> {new_width}x{new_height}: comfy.utils.lanczos {batch / pil_seconds:8.1f} images/s, lanczos_resize {batch / torch_seconds:8.1f} images/s ({pil_seconds / torch_seconds:.1f}x)")
+
+def crop_square_reference(image, x, y, crop_size, zoomed_width, zoomed_height, target_rez):
+    # Crop Image Square before crop-before-resample: resize the whole image, slice the square, resize again, kept as reference
+    output = jps_nodes.lanczos_resize(image.permute([0, 3, 1, 2]), zoomed_width, zoomed_height)[:, :, y:y + crop_size, x:x + crop_size]
+    if target_rez != 0:
+        output = jps_nodes.lanczos_resize(output, target_rez, target_rez)
+    return output.permute([0, 2, 3, 1])
+
+def bench_crop_square(batch=2):
+    """
+    Compares Crop Image Square with the reference that resizes the whole image before cropping, on 4K frames.
+    The node clamps to 0..1 once per dimension instead of after both resizes, so pixels that overshoot in the first resize may differ.
+    """
+    print(f"Crop Image Square, 3840x2160, batch of {batch}")
+    node = jps_nodes.Crop_Image_Square()
+    generator = torch.Generator().manual_seed(0)
+    rows = torch.linspace(0, 1, 2160)[:, None]
+    columns = torch.linspace(0, 1, 3840)[None, :]
+    # smooth content with a little noise, like a photo
+    image = torch.stack([torch.sin(40 * columns + 20 * rows) * 0.4 + 0.5, columns * rows, torch.cos(60 * rows + 0 * columns) * 0.3 + 0.5], -1)
+    image = (image + torch.rand(batch, 2160, 3840, 3, generator=generator) * 0.05).clamp(0, 1)
+
+    for zoom, target_rez in ((1, 0), (1, 224), (1.5, 1024), (3, 224), (3, 0)):
+        def run_node():
+            return node.crop_square(image, "center", 0, 0, zoom, "lanczos", target_rez, 0)[0]
+
+        zoomed_width, zoomed_height = int(3840 * zoom), int(2160 * zoom)
+        x, y = round((zoomed_width - 2160) / 2), round((zoomed_height - 2160) / 2)
+        reference_seconds, reference = timed(lambda: crop_square_reference(image, x, y, 2160, zoomed_width, zoomed_height, target_rez), repeat=1)
+        node_seconds, output = timed(run_node, repeat=1)
+        difference = (reference - output).abs().max().item()
+        print(f"  zoom {zoom}, target_rez {target_rez:4}: resize then crop {reference_seconds * 1000:8.0f} ms, crop_square {node_seconds * 1000:8.0f} ms ({reference_seconds / node_seconds:.1f}x), max difference {difference * 255:.3f}/255")
+
+def sharpen_then_crop_reference(resized_image, x, y, target_w, target_h, sharpening):
+    # Crop Image Target Size before crop-before-sharpen: sharpen the whole resized image, then slice the crop, kept as reference
+    output = jps_nodes.contrast_adaptive_sharpening(resized_image.permute([0, 3, 1, 2]), sharpening).permute([0, 2, 3, 1])
+    return output[:, y:y + target_h, x:x + target_w, :]
+
+def bench_crop_targetsize_panorama(batch=4):
+    """
+    Crops wide panoramas to squares with Crop Image Target Size and sharpening, and compares the node,
+    which only sharpens the crop, with sharpening the whole resized image.
+    """
+    print(f"Crop Image Target Size with sharpening, panoramas to squares, batch of {batch}")
+    node = jps_nodes.Crop_Image_TargetSize()
+    for (height, width), target in (((1024, 4096), 1024), ((1024, 8192), 1024), ((768, 6144), 512)):
+        images = make_images(batch, height, width).permute([0, 2, 3, 1])
+        # target sizes that keep the height, so the node and the reference crop the same window of the same resized image
+        resized_image = jps_nodes.lanczos_resize(images.permute([0, 3, 1, 2]), round(target * width / height), target).permute([0, 2, 3, 1])
+        x = (resized_image.shape[2] - target) // 2
+
+        reference_seconds, reference = timed(lambda: sharpen_then_crop_reference(resized_image, x, 0, target, target, 0.5), repeat=1)
+        node_seconds, output = timed(lambda: node.crop_targetsize(images, target, target, "center", 0, "lanczos", 0.5)[0], repeat=1)
+        resize_seconds, _ = timed(lambda: jps_nodes.lanczos_resize(images.permute([0, 3, 1, 2]), resized_image.shape[2], target), repeat=1)
+        assert torch.equal(reference, output)
+        sharpened_share = target / resized_image.shape[2]
+        print(f"  {width}x{height} -> {target}x{target}: sharpen then crop {(reference_seconds + resize_seconds) * 1000:8.0f} ms, crop_targetsize {node_seconds * 1000:8.0f} ms "
+              f"(resize {resize_seconds * 1000:.0f} ms, {sharpened_share:.0%} of the pixels sharpened), identical output")
+
+def min_reference(tensor_list):
+    x = torch.stack(tensor_list)
+    mn = x.min(axis=0)[0]
+    return torch.clamp(mn, min=0)
+
+def max_reference(tensor_list):
+    x = torch.stack(tensor_list)
+    mx = x.max(axis=0)[0]
+    return torch.clamp(mx, max=1)
+
+def contrast_adaptive_sharpening_reference(image, amount):
+    # contrast_adaptive_sharpening before the pairwise minimum and maximum, kept as reference
+    img = F.pad(image, pad=(1, 1, 1, 1)).cpu()
+
+    a = img[..., :-2, :-2]
+    b = img[..., :-2, 1:-1]
+    c = img[..., :-2, 2:]
+    d = img[..., 1:-1, :-2]
+    e = img[..., 1:-1, 1:-1]
+    f = img[..., 1:-1, 2:]
+    g = img[..., 2:, :-2]
+    h = img[..., 2:, 1:-1]
+    i = img[..., 2:, 2:]
+
+    cross = (b, d, e, f, h)
+    mn = min_reference(cross)
+    mx = max_reference(cross)
+
+    diag = (a, c, g, i)
+    mn2 = min_reference(diag)
+    mx2 = max_reference(diag)
+    mx = mx + mx2
+    mn = mn + mn2
+
+    inv_mx = torch.reciprocal(mx)
+    amp = inv_mx * torch.minimum(mn, (2 - mx))
+
+    amp = torch.sqrt(amp)
+    w = - amp * (amount * (1/5 - 1/8) + 1/8)
+    div = torch.reciprocal(1 + 4*w)
+
+    output = ((b + d + f + h)*w + e) * div
+    output = output.clamp(0, 1)
+    output = torch.nan_to_num(output)
+
+    return (output)
+
+def measure_sharpening(implementation, shape, device):
+    """
+    Runs one sharpening implementation in a fresh process and returns (seconds, peak bytes).
+    On CPU the peak is the growth of the maximum resident set size, so the process must not have been larger before.
+    """
+    batch, _, height, width = shape
+    images = make_images(batch, height, width).to(device)
+    if implementation == "reference":
+        function = contrast_adaptive_sharpening_reference
+    else:
+        jps_nodes.CAS_COMPILE = implementation == "compiled"
+        function = jps_nodes.contrast_adaptive_sharpening
+        # compile outside the measurement, on a small crop with the same batch size and different height and width
+        function(images[:, :, :64, :96], 0.5)
+
+    if device == "cuda":
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+        before = torch.cuda.memory_allocated()
+    else:
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    output = function(images, 0.5)
+    if device == "cuda":
+        peak = torch.cuda.max_memory_allocated() - before
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - before
+    del output
+
+    # the latency is taken from a second run, after the first one allocated its buffers
+    start = time.perf_counter()
+    function(images, 0.5)
+    if device == "cuda":
+        torch.cuda.synchronize()
+    seconds = time.perf_counter() - start
+
+    return seconds, peak
+
+def bench_sharpening(shapes=((1, 3, 2160, 3840), (8, 3, 1024, 1024))):
+    """
+    Compares latency and peak memory of contrast_adaptive_sharpening, eager and compiled, with the stacked reference implementation.
+    """
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"contrast_adaptive_sharpening on {device}")
+    context = multiprocessing.get_context("spawn")
+    for shape in shapes:
+        image_bytes = torch.Size(shape).numel() * 4
+        for implementation in ("reference", "eager", "compiled"):
+            with context.Pool(1) as pool:
+                seconds, peak = pool.apply(measure_sharpening, (implementation, shape, device))
+            print(f"  {'x'.join(map(str, shape))} {implementation:9}: {seconds * 1000:8.0f} ms, peak {peak / 1024 / 1024:8.0f} MB ({peak / image_bytes:.1f}x the image)")
+
+def measure_budgeted_crop(node_name, shape, budget_mb):
+    """
+    Runs one crop node on a batch of frames in a fresh process with the given image memory budget.
+    Returns (seconds, peak bytes above the input, hash of the output).
+    """
+    jps_nodes.IMAGE_MEMORY_BUDGET_MB = budget_mb
+    # made in place, so creating the input does not raise the maximum resident set size above the input
+    images = torch.rand(*shape, 3, generator=torch.Generator().manual_seed(0)).mul_(255).round_().div_(255)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    start = time.perf_counter()
+    if node_name == "Crop Image Square":
+        output = jps_nodes.Crop_Image_Square().crop_square(images, "center", 0, 0, 1.5, "lanczos", 1024, 0.5)[0]
+    else:
+        output = jps_nodes.Crop_Image_TargetSize().crop_targetsize(images, 1024, 1024, "center", 0, "lanczos", 0.5)[0]
+    seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - before
+    return seconds, peak, hashlib.blake2b(output.numpy().tobytes()).hexdigest()
+
+def bench_memory_budget(shape=(24, 1080, 1920), budgets=(0, 1024, 256)):
+    """
+    Runs the crop nodes on a batch of video frames with and without JPS_IMAGE_MEMORY_BUDGET_MB and checks that the outputs are identical.
+    """
+    print(f"crop nodes with a memory budget, {shape[0]} frames of {shape[2]}x{shape[1]}, peak memory above the input")
+    context = multiprocessing.get_context("spawn")
+    for node_name in ("Crop Image Square", "Crop Image Target Size"):
+        hashes = set()
+        for budget_mb in budgets:
+            with context.Pool(1) as pool:
+                seconds, peak, output_hash = pool.apply(measure_budgeted_crop, (node_name, shape, budget_mb))
+            hashes.add(output_hash)
+            print(f"  {node_name}, budget {budget_mb or 'none':>4} MB: {seconds * 1000:8.0f} ms, peak {peak / 1024 / 1024:8.0f} MB")
+        assert len(hashes) == 1, "chunked output differs"
+        print("  identical output")
+
+def bench_per_frame_crops(batch=48, zooms=(1.2, 1.5)):
+    """
+    Crops face-tracked video frames with per-frame offsets and zooms in one Crop Image Square call,
+    and compares it with running the node once per frame. Frames with the same window are resampled together.
+    """
+    print(f"Crop Image Square with per-frame offsets, {batch} frames of 1920x1080 -> 512x512")
+    node = jps_nodes.Crop_Image_Square()
+    images = make_images(batch, 1080, 1920).permute([0, 2, 3, 1]).contiguous()
+    frame_zooms = [zooms[frame * len(zooms) // batch] for frame in range(batch)]
+
+    # a slowly moving face, tracked on every frame or on every fourth frame
+    for tracking_step in (1, 4):
+        offsets_x = [round(200 * math.sin(frame // tracking_step / 10)) for frame in range(batch)]
+        offsets_y = [round(60 * math.cos(frame // tracking_step / 7)) for frame in range(batch)]
+
+        def run_per_frame():
+            return torch.cat([node.crop_square(images[frame:frame + 1], "center", offsets_x[frame], offsets_y[frame], frame_zooms[frame], "lanczos", 512, 0.3)[0] for frame in range(batch)])
+
+        def run_batched():
+            return node.crop_square(images, "center", 0, 0, 1, "lanczos", 512, 0.3, "\n".join(map(str, offsets_x)), "\n".join(map(str, offsets_y)), "\n".join(map(str, frame_zooms)))[0]
+
+        per_frame_seconds, reference = timed(run_per_frame, repeat=1)
+        batched_seconds, output = timed(run_batched, repeat=1)
+        assert torch.equal(reference, output)
+        print(f"  tracked every {tracking_step} frames: once per frame {per_frame_seconds * 1000:8.0f} ms, per-frame lists {batched_seconds * 1000:8.0f} ms ({per_frame_seconds / batched_seconds:.1f}x), identical output")
+
+def bench_tiles(batch=4, size=2048, tile_size=512):
+    """
+    Cuts a grid of tiles with Crop Image Tiles and compares it with copying every tile on its own,
+    stitches the tiles back together, and compares several IP-Adapter crops in one call with one Crop Image Square call per crop.
+    """
+    print(f"Crop Image Tiles, {batch} images of {size}x{size}")
+    tiler = jps_nodes.Crop_Image_Tiles()
+    stitcher = jps_nodes.Stitch_Image_Tiles()
+    images = make_images(batch, size, size).permute([0, 2, 3, 1]).contiguous()
+
+    for overlap in (0, 128):
+        windows = [(x, y, tile_size) for y in jps_nodes.get_tile_positions(size, tile_size, overlap) for x in jps_nodes.get_tile_positions(size, tile_size, overlap)]
+
+        def run_copies():
+            return torch.cat([images[:, y:y + tile_size, x:x + tile_size].contiguous()[:, None] for x, y, _ in windows], 1).reshape(-1, tile_size, tile_size, 3)
+
+        copies_seconds, reference = timed(run_copies)
+        tiles_seconds, (tiles, tile_info) = timed(lambda: tiler.crop_tiles(images, tile_size, overlap, "lanczos", 0, 0))
+        assert torch.equal(reference, tiles)
+        stitch_seconds, (stitched, ) = timed(lambda: stitcher.stitch_tiles(tiles, tile_info, overlap // 2))
+        error = (stitched - images).abs().max().item()
+        print(f"  {len(windows)} tiles of {tile_size}, overlap {overlap}: tile by tile {copies_seconds * 1000:7.1f} ms, Crop Image Tiles {tiles_seconds * 1000:7.1f} ms ({copies_seconds / tiles_seconds:.1f}x), "
+              f"stitched in {stitch_seconds * 1000:7.1f} ms, max error {error * 255:.5f}/255")
+
+    # three square IP-Adapter crops of a 1920x1080 image, resized to 224
+    print("Crop Image Tiles with windows, 1920x1080 -> 3 crops of 224x224")
+    images = make_images(batch, 1080, 1920).permute([0, 2, 3, 1]).contiguous()
+    node = jps_nodes.Crop_Image_Square()
+    offsets = (0, 420, 840)
+    square_seconds, reference = timed(lambda: torch.stack([node.crop_square(images, "left", offset, 0, 1, "lanczos", 224, 0.3)[0] for offset in offsets], 1).reshape(-1, 224, 224, 3))
+    tiles_seconds, (tiles, _) = timed(lambda: tiler.crop_tiles(images, 0, 0, "lanczos", 224, 0.3, "\n".join(f"{offset}, 0, 1080" for offset in offsets)))
+    assert torch.equal(reference, tiles)
+    print(f"  Crop Image Square per crop {square_seconds * 1000:7.1f} ms, Crop Image Tiles {tiles_seconds * 1000:7.1f} ms ({square_seconds / tiles_seconds:.1f}x), identical output")
+
+def bench_crop_cache(queue_items=50, budget_mb=64):
+    """
+    Runs the crop nodes for queue items that all use the same reference images, with and without the crop result cache,
+    then cycles through more images than the budget holds to show evictions.
+    """
+    print(f"crop result cache, {queue_items} queue items with the same reference images, budget {budget_mb} MB")
+    square_node = jps_nodes.Crop_Image_Square()
+    targetsize_node = jps_nodes.Crop_Image_TargetSize()
+    reference_images = [make_images(1, 1024, 1024, seed).permute([0, 2, 3, 1]).contiguous() for seed in range(2)]
+    frame = make_images(1, 1080, 1920, 2).permute([0, 2, 3, 1]).contiguous()
+
+    def run_queue():
+        # ComfyUI passes a new tensor object when the loader node runs again
+        outputs = []
+        for _ in range(queue_items):
+            for image in reference_images:
+                image = image.clone()
+                outputs.append(square_node.crop_square(image=image, crop_position="center", offset_x=0, offset_y=0, zoom=1, interpolation="lanczos", target_rez=224, sharpening=0.3)[0])
+            image = frame.clone()
+            outputs.append(targetsize_node.crop_targetsize(image=image, target_w=1024, target_h=576, crop_position="center", offset=0, interpolation="lanczos", sharpening=0.3)[0])
+        return outputs
+
+    original_budget = jps_nodes.crop_result_cache.max_bytes
+    try:
+        jps_nodes.crop_result_cache.max_bytes = 0
+        uncached_seconds, reference = timed(run_queue, repeat=1)
+
+        jps_nodes.crop_result_cache.max_bytes = budget_mb * 1024 * 1024
+        jps_nodes.crop_result_cache.clear()
+        cached_seconds, outputs = timed(run_queue, repeat=1)
+        assert all(torch.equal(a, b) for a, b in zip(reference, outputs))
+        stats = jps_nodes.crop_result_cache.stats()
+        print(f"  without cache {uncached_seconds * 1000:8.0f} ms, with cache {cached_seconds * 1000:8.0f} ms ({uncached_seconds / cached_seconds:.1f}x), identical output, "
+              f"{stats['hits']} hits, {stats['misses']} misses, {stats['bytes'] / 1024 / 1024:.1f} MB cached")
+        # ComfyUI runs nodes in inference mode, the cloned images are inference tensors without a version counter
+        with torch.inference_mode():
+            inference_seconds, outputs = timed(run_queue, repeat=1)
+        assert all(torch.equal(a, b) for a, b in zip(reference, outputs))
+        print(f"  with cache in inference mode {inference_seconds * 1000:8.0f} ms ({uncached_seconds / inference_seconds:.1f}x), identical output")
+
+        fingerprint_seconds, _ = timed(lambda: jps_nodes.get_image_fingerprint(frame.clone()))
+        print(f"  fingerprint of a 1920x1080 frame {fingerprint_seconds * 1000:.1f} ms")
+
+        # twelve 1024x576 results of 7 MB each do not fit into 64 MB
+        jps_nodes.crop_result_cache.clear()
+        stats = jps_nodes.crop_result_cache.stats()
+        hits, evictions = stats["hits"], stats["evictions"]
+        frames = [make_images(1, 1080, 1920, seed).permute([0, 2, 3, 1]).contiguous() for seed in range(12)]
+        for image in frames + frames:
+            targetsize_node.crop_targetsize(image=image, target_w=1024, target_h=576, crop_position="center", offset=0, interpolation="lanczos", sharpening=0)
+        stats = jps_nodes.crop_result_cache.stats()
+        print(f"  cycling through {len(frames)} frames: {stats['hits'] - hits} hits, {stats['evictions'] - evictions} evictions, {stats['bytes'] / 1024 / 1024:.1f} MB cached")
+    finally:
+        jps_nodes.crop_result_cache.max_bytes = original_budget
+        jps_nodes.crop_result_cache.clear()
+
+if __name__ == "__main__":
+    check_lanczos_parity()
+    bench_lanczos()
+    bench_crop_square()
+    bench_crop_targetsize_panorama()
+    bench_sharpening()
+    bench_memory_budget()
+    bench_per_frame_crops()
+    bench_tiles()
+    bench_crop_cache()
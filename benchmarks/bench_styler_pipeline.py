@@ -0,0 +1,266 @@
+"""
+Benchmark suite for the SDXL Prompt Styler pipeline, using synthetic style catalogs.
+
+Times load_style_catalog, SDXL_Prompt_Styler.INPUT_TYPES and sdxlpromptstyler for several catalog sizes,
+prompt lengths, duplicate rates and template shapes, measures the memory held by a loaded catalog
+and the cost of the shared catalog mode, and writes the results to a JSON file.
+
+Usage: python benchmarks/bench_styler_pipeline.py [--sizes 1000 10000 100000] [--duplicate-rates 0 0.2] [--output bench_styler.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+import comfy_stubs
+
+comfy_stubs.install()
+
+import jps_nodes
+
+FILE_SIZE = 10000
+
+WORDS = ("cinematic", "lighting", "oil", "painting", "portrait", "vivid", "colors", "detailed", "texture", "moody",
+         "atmosphere", "dramatic", "shadows", "soft", "focus", "film", "grain", "surreal", "composition", "golden", "hour")
+
+# catalogs usually share a few negative prompts between many entries
+NEGATIVE_PROMPTS = ("", "blurry, low quality", "photo, photorealistic, realism, ugly", "anime, cartoon, graphic, text, painting, crayon, graphite, abstract, glitch, deformed")
+
+# template shapes: split into g and l at "{prompt} .", only a g prompt, and a split with an empty l part
+TEMPLATE_SHAPES = {
+    "split": "{words} {{prompt}} . {more_words}",
+    "no_split": "{words} {{prompt}}, {more_words}",
+    "empty_l": "{words} {{prompt}} .",
+}
+
+# text_positive_g / text_positive_l combinations handled differently by the styler chain
+PROMPT_SHAPES = {
+    "g_equals_l": ("a red fox in the snow", "a red fox in the snow"),
+    "g_differs_l": ("a red fox in the snow", "winter, cold morning light"),
+    "empty_l": ("a red fox in the snow", ""),
+}
+
+def make_words(rnd, minimum, maximum):
+    return " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(minimum, maximum)))
+
+def write_catalog(directory, size, duplicate_rate, seed):
+    """
+    Writes a catalog of size templates to directory, split into files of FILE_SIZE entries.
+    duplicate_rate is the share of entries that reuse the name of an earlier entry.
+    """
+    rnd = random.Random(seed)
+    os.makedirs(directory)
+    shapes = list(TEMPLATE_SHAPES)
+    items = []
+    for position in range(size):
+        if items and rnd.random() < duplicate_rate:
+            name = rnd.choice(items)["name"]
+        else:
+            name = f"Style {position}"
+        shape = shapes[position % len(shapes)]
+        items.append({
+            "name": name,
+            "prompt": TEMPLATE_SHAPES[shape].format(words=make_words(rnd, 2, 20), more_words=make_words(rnd, 5, 80)),
+            "negative_prompt": rnd.choice(NEGATIVE_PROMPTS),
+        })
+
+    for start in range(0, size, FILE_SIZE):
+        with open(os.path.join(directory, f"sdxl_styles_{start // FILE_SIZE:03}.json"), 'w', encoding='utf-8') as file:
+            json.dump(items[start:start + FILE_SIZE], file)
+
+def clear_caches():
+    jps_nodes.style_catalog_cache.clear()
+    jps_nodes.lazy_style_catalog_cache.clear()
+    jps_nodes.shared_style_catalog_cache.clear()
+    jps_nodes.style_template_cache.clear()
+    jps_nodes.styler_result_cache.clear()
+
+def remove_bundles(directories):
+    for directory in directories:
+        bundle_path = os.path.join(directory, jps_nodes.STYLE_BUNDLE_FILENAME)
+        if os.path.exists(bundle_path):
+            os.remove(bundle_path)
+
+def timed(function, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+def bench_loading(directories, results, label):
+    directory = directories["artists"]
+
+    clear_caches()
+    remove_bundles(directories.values())
+    seconds, catalog = timed(lambda: jps_nodes.load_style_catalog(directory))
+    results.append(dict(label, benchmark="load_style_catalog_cold", seconds=seconds, renamed_styles=catalog["renamed_styles"]))
+
+    clear_caches()
+    seconds, _ = timed(lambda: jps_nodes.load_style_catalog(directory))
+    results.append(dict(label, benchmark="load_style_catalog_bundle", seconds=seconds))
+
+    seconds, _ = timed(lambda: jps_nodes.load_style_catalog(directory), repeat=20)
+    results.append(dict(label, benchmark="load_style_catalog_cached", seconds=seconds))
+
+    clear_caches()
+    seconds, _ = timed(lambda: jps_nodes.load_lazy_style_catalog(directory))
+    results.append(dict(label, benchmark="load_lazy_style_catalog_cold", seconds=seconds))
+
+def bench_memory(directories, results, label):
+    """
+    Compares the memory held by the catalog of load_style_catalog with the list of dictionaries returned by load_styles_from_directory.
+    """
+    directory = directories["artists"]
+
+    clear_caches()
+    remove_bundles(directories.values())
+    tracemalloc.start()
+    json_data = jps_nodes.load_styles_from_directory(directory)
+    list_of_dicts_bytes = tracemalloc.get_traced_memory()[0]
+    del json_data
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    catalog = jps_nodes.load_style_catalog(directory)
+    catalog_bytes = tracemalloc.get_traced_memory()[0]
+    del catalog
+    clear_caches()
+    tracemalloc.stop()
+
+    results.append(dict(label, benchmark="memory_list_of_dicts", bytes=list_of_dicts_bytes))
+    results.append(dict(label, benchmark="memory_style_catalog", bytes=catalog_bytes))
+
+def bench_shared(directories, results, label):
+    """
+    Times building and mapping a shared catalog file, and measures the memory a process holds for a mapped catalog.
+    A cleared shared_style_catalog_cache stands in for a newly started process.
+    """
+    directory = directories["artists"]
+    original_cache_directory = jps_nodes.STYLES_SHARED_CACHE_DIR
+    with tempfile.TemporaryDirectory() as cache_directory:
+        jps_nodes.STYLES_SHARED_CACHE_DIR = cache_directory
+        try:
+            clear_caches()
+            seconds, _ = timed(lambda: jps_nodes.load_shared_style_catalog(directory))
+            results.append(dict(label, benchmark="load_shared_style_catalog_build", seconds=seconds))
+
+            clear_caches()
+            tracemalloc.start()
+            seconds, catalog = timed(lambda: jps_nodes.load_shared_style_catalog(directory))
+            catalog_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            results.append(dict(label, benchmark="load_shared_style_catalog_mapped", seconds=seconds))
+            results.append(dict(label, benchmark="memory_shared_style_catalog", bytes=catalog_bytes))
+
+            file_bytes = os.path.getsize(jps_nodes.get_shared_style_catalog_path(directory))
+            results.append(dict(label, benchmark="shared_style_catalog_file", bytes=file_bytes))
+            del catalog
+            clear_caches()
+        finally:
+            jps_nodes.STYLES_SHARED_CACHE_DIR = original_cache_directory
+
+def bench_input_types(directories, results, label):
+    clear_caches()
+    remove_bundles(directories.values())
+    seconds, _ = timed(jps_nodes.SDXL_Prompt_Styler.INPUT_TYPES)
+    results.append(dict(label, benchmark="INPUT_TYPES_cold", seconds=seconds))
+
+    seconds, _ = timed(jps_nodes.SDXL_Prompt_Styler.INPUT_TYPES, repeat=20)
+    results.append(dict(label, benchmark="INPUT_TYPES_cached", seconds=seconds))
+
+def bench_styler(directories, results, label, calls=2000):
+    clear_caches()
+    jps_nodes.SDXL_Prompt_Styler.INPUT_TYPES()
+    styler = jps_nodes.SDXL_Prompt_Styler()
+    style_catalogs = jps_nodes.SDXL_Prompt_Styler.style_catalogs
+
+    # sort the style names by the shape of their template
+    shapes = {}
+    for key in ("artists", "movies", "styles"):
+        shapes[key] = {shape: [] for shape in TEMPLATE_SHAPES}
+        for name, template in style_catalogs[key]["template_index"].items():
+            if template.prompt_l:
+                shapes[key]["split"].append(name)
+            elif template.prompt_g_fragments[-1]:
+                shapes[key]["no_split"].append(name)
+            else:
+                shapes[key]["empty_l"].append(name)
+
+    rnd = random.Random(0)
+    result_cache_limits = jps_nodes.styler_result_cache.max_entries, jps_nodes.styler_result_cache.max_bytes
+    for template_shape in TEMPLATE_SHAPES:
+        selections = [tuple(rnd.choice(shapes[key][template_shape]) for key in ("artists", "movies", "styles")) for _ in range(calls)]
+        for prompt_shape, (text_positive_g, text_positive_l) in PROMPT_SHAPES.items():
+            def run():
+                for artist, movie, style in selections:
+                    styler.sdxlpromptstyler(text_positive_g, text_positive_l, "blurry", artist, movie, style, "ON")
+
+            # without result cache, then with a warm result cache
+            jps_nodes.styler_result_cache.max_entries, jps_nodes.styler_result_cache.max_bytes = 0, 0
+            seconds, _ = timed(run)
+            results.append(dict(label, benchmark="sdxlpromptstyler", template_shape=template_shape, prompt_shape=prompt_shape, calls_per_second=calls / seconds))
+
+            jps_nodes.styler_result_cache.max_entries, jps_nodes.styler_result_cache.max_bytes = calls, 0
+            run()
+            seconds, _ = timed(run)
+            results.append(dict(label, benchmark="sdxlpromptstyler_result_cache", template_shape=template_shape, prompt_shape=prompt_shape, calls_per_second=calls / seconds))
+            jps_nodes.styler_result_cache.clear()
+
+    jps_nodes.styler_result_cache.max_entries, jps_nodes.styler_result_cache.max_bytes = result_cache_limits
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--duplicate-rates", type=float, nargs="+", default=[0.0, 0.2])
+    parser.add_argument("--output", default="bench_styler.json")
+    options = parser.parse_args()
+
+    results = []
+    original_directories = jps_nodes.STYLE_CATALOG_DIRECTORIES
+    try:
+        for size in options.sizes:
+            for duplicate_rate in options.duplicate_rates:
+                with tempfile.TemporaryDirectory() as root:
+                    directories = {key: os.path.join(root, key) for key in original_directories}
+                    for seed, directory in enumerate(directories.values()):
+                        write_catalog(directory, size, duplicate_rate, seed)
+                    jps_nodes.STYLE_CATALOG_DIRECTORIES = directories
+
+                    label = {"catalog_size": size, "duplicate_rate": duplicate_rate}
+                    bench_loading(directories, results, label)
+                    bench_memory(directories, results, label)
+                    bench_shared(directories, results, label)
+                    bench_input_types(directories, results, label)
+                    bench_styler(directories, results, label)
+                    clear_caches()
+                print(f"catalog size {size}, duplicate rate {duplicate_rate}: done")
+    finally:
+        jps_nodes.STYLE_CATALOG_DIRECTORIES = original_directories
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(options.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+
+    for result in results:
+        if "seconds" in result:
+            value = f"{result['seconds'] * 1000:10.2f} ms"
+        elif "bytes" in result:
+            value = f"{result['bytes'] / 1024 / 1024:10.2f} MB"
+        else:
+            value = f"{result['calls_per_second']:10,.0f} calls/s"
+        shapes = f" {result['template_shape']}/{result['prompt_shape']}" if "template_shape" in result else ""
+        print(f"{result['catalog_size']:7} {result['duplicate_rate']:4} {result['benchmark']}{shapes}: {value}")
+    print(f"results written to {options.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmarks for the SDXL Prompt Styler.
+
+Usage: python benchmarks/bench_styles.py
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import comfy_stubs
+
+comfy_stubs.install()
+
+import jps_nodes
+
+STYLE_DIRECTORIES = ("artists", "movies", "main")
+
+def renders_per_second(render, templates, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for template in templates:
+            render(template)
+    return repeat * len(templates) / (time.perf_counter() - start)
+
+def bench_render(repeat=50):
+    """
+    Compares replace_prompts_in_template on the raw templates with the precompiled StyleTemplate.render.
+    """
+    json_data = []
+    for directory in STYLE_DIRECTORIES:
+        json_data += jps_nodes.load_styles_from_directory(os.path.join(comfy_stubs.REPO_DIRECTORY, 'styles', directory))[0]
+    compiled = list(jps_nodes.build_template_index(json_data).values())
+
+    prompts = ("a cat sitting on a chair", "soft light, 35mm", "blurry")
+    before = renders_per_second(lambda template: jps_nodes.replace_prompts_in_template(template, *prompts), json_data, repeat)
+    after = renders_per_second(lambda template: template.render(*prompts), compiled, repeat)
+
+    print(f"render ({len(json_data)} templates)")
+    print(f"  replace_prompts_in_template: {before:12,.0f} renders/s")
+    print(f"  StyleTemplate.render:        {after:12,.0f} renders/s  ({after / before:.1f}x)")
+
+def make_unique_style_names_quadratic(names):
+    # duplicate handling of load_styles_from_directory before per-name suffix counters, kept as reference
+    seen = set()
+    unique_names = []
+    for original_style in names:
+        style = original_style
+        suffix = 1
+        while style in seen:
+            style = f"{original_style}_{suffix}"
+            suffix += 1
+        seen.add(style)
+        unique_names.append(style)
+    return unique_names
+
+def bench_duplicates(sizes=(1000, 2500, 5000)):
+    """
+    Loads catalogs in which every entry has the same name, the worst case for duplicate renaming.
+    """
+    print("duplicate names (all entries named 'Artist')")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'sdxl_styles_duplicates.json'), 'w', encoding='utf-8') as file:
+                json.dump([{"name": "Artist", "prompt": "{prompt} by Artist", "negative_prompt": ""} for _ in range(size)], file)
+
+            start = time.perf_counter()
+            catalog = jps_nodes.load_style_catalog(directory)
+            load_seconds = time.perf_counter() - start
+
+        names = ["Artist"] * size
+        start = time.perf_counter()
+        reference = make_unique_style_names_quadratic(names)
+        reference_seconds = time.perf_counter() - start
+
+        assert reference == catalog["style_names"]
+        print(f"  {size:6} entries: load_style_catalog {load_seconds * 1000:9.1f} ms ({catalog['renamed_styles']} renamed), quadratic renaming alone {reference_seconds * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    bench_render()
+    bench_duplicates()
@@ -0,0 +1,55 @@
+"""
+Minimal stand-ins for the ComfyUI modules imported by jps_nodes.py, so the benchmarks run without a ComfyUI checkout.
+Real modules are used whenever they can be imported.
+"""
+
+import os
+import sys
+import types
+
+REPO_DIRECTORY = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+def _lanczos(samples, width, height):
+    # same PIL round trip as comfy.utils.lanczos
+    import numpy as np
+    import torch
+    from PIL import Image
+
+    images = [Image.fromarray(np.clip(255. * image.movedim(0, -1).cpu().numpy(), 0, 255).astype(np.uint8)) for image in samples]
+    images = [image.resize((width, height), resample=Image.Resampling.LANCZOS) for image in images]
+    images = [torch.from_numpy(np.array(image).astype(np.float32) / 255.0).movedim(-1, 0) for image in images]
+    result = torch.stack(images)
+    return result.to(samples.device, samples.dtype)
+
+def install():
+    """
+    Registers stub modules for comfy and folder_paths if ComfyUI is not importable, then makes jps_nodes importable.
+    """
+    try:
+        import comfy.samplers
+        import comfy.utils
+        import folder_paths
+    except ImportError:
+        comfy = types.ModuleType("comfy")
+        comfy.__path__ = []
+        sd = types.ModuleType("comfy.sd")
+        samplers = types.ModuleType("comfy.samplers")
+        samplers.KSampler = type("KSampler", (), {"SAMPLERS": ["euler"], "SCHEDULERS": ["normal"]})
+        utils = types.ModuleType("comfy.utils")
+        utils.lanczos = _lanczos
+        cli_args = types.ModuleType("comfy.cli_args")
+        cli_args.args = types.SimpleNamespace(disable_metadata=False)
+        comfy.sd, comfy.samplers, comfy.utils, comfy.cli_args = sd, samplers, utils, cli_args
+        folder_paths = types.ModuleType("folder_paths")
+        folder_paths.get_output_directory = lambda: os.getcwd()
+        sys.modules.update({
+            "comfy": comfy,
+            "comfy.sd": sd,
+            "comfy.samplers": samplers,
+            "comfy.utils": utils,
+            "comfy.cli_args": cli_args,
+            "folder_paths": folder_paths,
+        })
+
+    if REPO_DIRECTORY not in sys.path:
+        sys.path.insert(0, REPO_DIRECTORY)
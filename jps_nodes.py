@@ -11,8 +11,22 @@
 #------------------------------------------------------------------------#
 
 import torch
+import asyncio
+import bisect
+import concurrent.futures
+import functools
+import hashlib
+import itertools
 import json
+import mmap
 import os
+import random
+import re
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
 import comfy.sd
 import folder_paths
 from datetime import datetime
@@ -22,21 +36,55 @@ from PIL.PngImagePlugin import PngInfo
 from comfy.cli_args import args
 import torch.nn.functional as F
 
-def min_(tensor_list):
-    # return the element-wise min of the tensor list.
-    x = torch.stack(tensor_list)
-    mn = x.min(axis=0)[0]
-    return torch.clamp(mn, min=0)
-    
-def max_(tensor_list):
-    # return the element-wise max of the tensor list.
-    x = torch.stack(tensor_list)
-    mx = x.max(axis=0)[0]
-    return torch.clamp(mx, max=1)
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+try:
+    from aiohttp import web
+    from server import PromptServer
+except ImportError:
+    PromptServer = None
+
+# Optional memory budget for the image nodes, in MB (0 means no limit).
+# Batches are processed in chunks of frames and sharpening also in bands of rows, so the temporaries of one chunk stay within the budget.
+# Chunks are written into one preallocated output and give the same results as processing the whole batch at once.
+IMAGE_MEMORY_BUDGET_MB = int(os.environ.get("JPS_IMAGE_MEMORY_BUDGET_MB", "0"))
+
+def get_chunk_size(count, item_bytes):
+    """
+    Returns how many of count items, each needing item_bytes of working memory, fit into the image memory budget, at least 1.
+    """
+    if IMAGE_MEMORY_BUDGET_MB <= 0:
+        return count
+    return max(min(IMAGE_MEMORY_BUDGET_MB * 1024 * 1024 // max(item_bytes, 1), count), 1)
+
+def map_image_chunks(function, images, frame_bytes):
+    """
+    Applies function to chunks of frames of images that fit into the image memory budget, frame_bytes is the working memory per frame.
+    The results are copied into one preallocated output.
+    """
+    batch_size = images.shape[0]
+    chunk_size = get_chunk_size(batch_size, frame_bytes)
+    if chunk_size >= batch_size:
+        return function(images)
+
+    output = None
+    for start in range(0, batch_size, chunk_size):
+        result = function(images[start:start + chunk_size])
+        if output is None:
+            output = torch.empty((batch_size,) + result.shape[1:], dtype=result.dtype, device=result.device)
+        output[start:start + chunk_size] = result
+    return output
+
+# Set JPS_CAS_COMPILE=1 to run contrast_adaptive_sharpening through torch.compile.
+CAS_COMPILE = os.environ.get("JPS_CAS_COMPILE", "0") == "1"
+compiled_sharpening_kernel = None
 
 # From https://github.com/Jamy-L/Pytorch-Contrast-Adaptive-Sharpening/
-def contrast_adaptive_sharpening(image, amount):
-    img = F.pad(image, pad=(1, 1, 1, 1)).cpu()
+def sharpening_kernel(image, sharpening_weight):
+    img = F.pad(image, pad=(1, 1, 1, 1))
 
     a = img[..., :-2, :-2]
     b = img[..., :-2, 1:-1]
@@ -47,38 +95,206 @@ def contrast_adaptive_sharpening(image, amount):
     g = img[..., 2:, :-2]
     h = img[..., 2:, 1:-1]
     i = img[..., 2:, 2:]
-    
-    # Computing contrast
-    cross = (b, d, e, f, h)
-    mn = min_(cross)
-    mx = max_(cross)
-    
-    diag = (a, c, g, i)
-    mn2 = min_(diag)
-    mx2 = max_(diag)
-    mx = mx + mx2
-    mn = mn + mn2
-    
+
+    # Computing contrast, pairwise into reused buffers so no stacked copies of the image are made
+    mn = torch.minimum(b, d)
+    torch.minimum(mn, e, out=mn)
+    torch.minimum(mn, f, out=mn)
+    torch.minimum(mn, h, out=mn).clamp_(min=0)
+    mx = torch.maximum(b, d)
+    torch.maximum(mx, e, out=mx)
+    torch.maximum(mx, f, out=mx)
+    torch.maximum(mx, h, out=mx).clamp_(max=1)
+
+    diag = torch.minimum(a, c)
+    torch.minimum(diag, g, out=diag)
+    mn += torch.minimum(diag, i, out=diag).clamp_(min=0)
+    torch.maximum(a, c, out=diag)
+    torch.maximum(diag, g, out=diag)
+    mx += torch.maximum(diag, i, out=diag).clamp_(max=1)
+
     # Computing local weight
-    inv_mx = torch.reciprocal(mx)
-    amp = inv_mx * torch.minimum(mn, (2 - mx))
+    torch.minimum(mn, torch.mul(mx, -1, out=diag).add_(2), out=mn)
+    amp = mn.mul_(mx.reciprocal_())
 
     # scaling
-    amp = torch.sqrt(amp)
-    w = - amp * (amount * (1/5 - 1/8) + 1/8)
-    div = torch.reciprocal(1 + 4*w)
+    w = amp.sqrt_().mul_(sharpening_weight)
+    div = torch.mul(w, 4, out=mx).add_(1).reciprocal_()
+
+    output = torch.add(b, d, out=diag)
+    output += f
+    output += h
+    output *= w
+    output += e
+    output *= div
+    output = output.clamp_(0, 1)
+
+    return torch.nan_to_num_(output)
+
+def run_sharpening_kernel(image, amount):
+    global CAS_COMPILE, compiled_sharpening_kernel
+
+    sharpening_weight = -(amount * (1/5 - 1/8) + 1/8)
+    if CAS_COMPILE:
+        try:
+            if compiled_sharpening_kernel is None:
+                compiled_sharpening_kernel = torch.compile(sharpening_kernel, dynamic=True)
+            # a tensor weight, so other amounts do not compile the kernel again
+            return compiled_sharpening_kernel(image, torch.tensor(sharpening_weight, dtype=image.dtype, device=image.device))
+        except Exception as e:
+            print(f"Warning: torch.compile failed for contrast adaptive sharpening, using eager mode: {str(e)}")
+            CAS_COMPILE = False
+
+    return sharpening_kernel(image, sharpening_weight)
+
+def contrast_adaptive_sharpening(image, amount):
+    """
+    Sharpens a [B, C, H, W] batch on the device of image.
+    Same results as the original min_/max_ version, which stacked shifted copies of the image and always returned a CPU tensor.
+    With an image memory budget, frames are sharpened in chunks and large frames in bands of rows with a 1 row halo.
+    """
+    batch_size, channels, height, width = image.shape
+    # the padded copy, three buffers and the input of the kernel
+    row_bytes = 5 * channels * (width + 2) * image.element_size()
+    frames = get_chunk_size(batch_size, row_bytes * (height + 2))
+    rows = height if frames > 1 else get_chunk_size(height, row_bytes)
+    if frames >= batch_size and rows >= height:
+        return run_sharpening_kernel(image, amount)
+
+    output = None
+    for start in range(0, batch_size, frames):
+        for row in range(0, height, rows):
+            end_row = min(row + rows, height)
+            halo = min(row, 1)
+            result = run_sharpening_kernel(image[start:start + frames, :, row - halo:end_row + 1], amount)
+            if output is None:
+                output = torch.empty((batch_size, channels, height, width), dtype=result.dtype, device=result.device)
+            output[start:start + frames, :, row:end_row] = result[:, :, halo:halo + end_row - row]
+    return output
+
+# Lanczos resampling in torch, used by the crop nodes instead of the PIL round trip of comfy.utils.lanczos.
+# Uses the filter of PIL (a = 3, widened by the scale when downscaling), so results are close to PIL without the 8-bit rounding.
+# Set JPS_LANCZOS_BACKEND=pil to use comfy.utils.lanczos again.
+LANCZOS_BACKEND = os.environ.get("JPS_LANCZOS_BACKEND", "torch")
+
+def lanczos_filter(x):
+    return torch.where(x.abs() < 3, torch.sinc(x) * torch.sinc(x / 3), torch.zeros_like(x))
+
+def get_lanczos_window(in_size, out_size, out_start, out_end):
+    """
+    Returns the weights of the output pixels out_start to out_end of a resize from in_size to out_size,
+    as (in_start, in_end, [in_end - in_start, out_end - out_start] weights) covering only the input pixels they use.
+    The windows are computed like PIL's resampling.
+    """
+    scale = in_size / out_size
+    filter_scale = max(scale, 1.0)
+    support = 3.0 * filter_scale
 
-    output = ((b + d + f + h)*w + e) * div
-    output = output.clamp(0, 1)
-    output = torch.nan_to_num(output)
+    centers = (torch.arange(out_start, out_end, dtype=torch.float64) + 0.5) * scale
+    starts = (centers - support + 0.5).floor().clamp(min=0)
+    ends = (centers + support + 0.5).floor().clamp(max=in_size)
+    in_start, in_end = int(starts[0]), int(ends[-1])
 
-    return (output)
+    positions = torch.arange(in_start, in_end, dtype=torch.float64)[:, None]
+    weights = lanczos_filter((positions - centers + 0.5) / filter_scale)
+    weights *= (positions >= starts) & (positions < ends)
+    totals = weights.sum(dim=0)
+    weights = torch.where(totals != 0, weights / totals, weights)
+
+    return in_start, in_end, weights
+
+@functools.lru_cache(maxsize=64)
+def get_lanczos_weights(in_size, out_size, crop_start=0, crop_size=None, target_size=None):
+    """
+    Returns the weights for resizing one dimension from in_size to out_size, split into blocks of neighbouring output pixels:
+    [(out_start, out_end, in_start, in_end, weights), ...] with [in_end - in_start, out_end - out_start] weights.
+    With crop_start and crop_size, only the output pixels crop_start to crop_start + crop_size are computed.
+    With target_size, the cropped pixels are resized again to target_size, both resizes are combined into one matrix per block.
+    Every block only covers the input pixels its outputs use, so the matrix products skip most of the zeros of the full weight matrix.
+    """
+    crop_size = out_size if crop_size is None else crop_size
+    size = crop_size if target_size is None else target_size
+    scale = in_size / out_size * crop_size / size
+
+    # blocks of about 100 input pixels were the fastest in benchmarks/bench_crop.py
+    block_size = min(max(round(96 / scale), 16), 128)
+    blocks = []
+    for out_start in range(0, size, block_size):
+        out_end = min(out_start + block_size, size)
+        if target_size is None:
+            in_start, in_end, weights = get_lanczos_window(in_size, out_size, crop_start + out_start, crop_start + out_end)
+        else:
+            crop_window_start, crop_window_end, target_weights = get_lanczos_window(crop_size, target_size, out_start, out_end)
+            in_start, in_end, weights = get_lanczos_window(in_size, out_size, crop_start + crop_window_start, crop_start + crop_window_end)
+            weights = weights @ target_weights
+        blocks.append((out_start, out_end, in_start, in_end, weights.float()))
+
+    return blocks
+
+def lanczos_resample(samples, blocks, dim):
+    """
+    Resamples a float tensor along dimension -1 or -2 with the weight blocks of get_lanczos_weights, clamped to 0..1 like an 8-bit PIL pass.
+    """
+    outputs = []
+    for out_start, out_end, in_start, in_end, weights in blocks:
+        weights = weights.to(samples.device, samples.dtype)
+        if dim == -1:
+            outputs.append(samples[..., in_start:in_end] @ weights)
+        else:
+            outputs.append(weights.T @ samples[..., in_start:in_end, :])
+
+    return torch.cat(outputs, dim).clamp_(0, 1)
+
+def lanczos_resize(samples, width, height):
+    """
+    Resizes a [B, C, H, W] batch with a Lanczos filter, on the device of samples.
+    Same arguments as comfy.utils.lanczos. Like PIL, the width is resampled first and unchanged dimensions are skipped.
+    """
+    if LANCZOS_BACKEND == "pil":
+        return comfy.utils.lanczos(samples, width, height)
+
+    output = samples if samples.dtype in (torch.float32, torch.float64) else samples.float()
+    if output.shape[-1] != width:
+        output = lanczos_resample(output, get_lanczos_weights(output.shape[-1], width), -1)
+    if output.shape[-2] != height:
+        output = lanczos_resample(output, get_lanczos_weights(output.shape[-2], height), -2)
+
+    return output.to(samples.dtype)
+
+def lanczos_crop(samples, width, height, x, y, crop_width, crop_height, target_width=None, target_height=None):
+    """
+    Returns the same as resizing a [B, C, H, W] batch to width x height with lanczos_resize, cropping the crop_width x crop_height window at x, y
+    and optionally resizing the crop to target_width x target_height, but only resamples the source pixels that end up in the crop.
+    Both resizes are done in one pass per dimension, dimensions that keep their size are sliced before the second resize.
+    """
+    if LANCZOS_BACKEND == "pil":
+        output = comfy.utils.lanczos(samples, width, height)[:, :, y:y + crop_height, x:x + crop_width]
+        return output if target_width is None else comfy.utils.lanczos(output, target_width, target_height)
+
+    output = samples if samples.dtype in (torch.float32, torch.float64) else samples.float()
+    if output.shape[-1] != width:
+        output = lanczos_resample(output, get_lanczos_weights(output.shape[-1], width, x, crop_width, target_width), -1)
+    else:
+        output = output[..., x:x + crop_width]
+        if target_width is not None and target_width != crop_width:
+            output = lanczos_resample(output, get_lanczos_weights(crop_width, target_width), -1)
+    if output.shape[-2] != height:
+        output = lanczos_resample(output, get_lanczos_weights(output.shape[-2], height, y, crop_height, target_height), -2)
+    else:
+        output = output[..., y:y + crop_height, :]
+        if target_height is not None and target_height != crop_height:
+            output = lanczos_resample(output, get_lanczos_weights(crop_height, target_height), -2)
+
+    return output.to(samples.dtype)
 
 def read_json_file(file_path):
     """
     Reads a JSON file's content and returns it.
     Ensures content matches the expected format.
     """
+    if file_path.endswith('.jsonl'):
+        return read_jsonl_file(file_path)
+
     if not os.access(file_path, os.R_OK):
         print(f"Warning: No read permissions for file {file_path}")
         return None
@@ -95,6 +311,129 @@ def read_json_file(file_path):
         print(f"An error occurred while reading {file_path}: {str(e)}")
         return None
 
+def is_valid_style_item(item):
+    return isinstance(item, dict) and 'name' in item and 'prompt' in item and 'negative_prompt' in item
+
+def iterate_jsonl_file(file_path):
+    """
+    Yields (item, byte offset, byte length) for every valid line of a JSONL file, one template per line.
+    Invalid lines are skipped, a warning reports how many.
+    """
+    invalid_lines = []
+    offset = 0
+    with open(file_path, 'rb') as file:
+        for line_number, line in enumerate(file, 1):
+            line_offset = offset
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                item = None
+            if not is_valid_style_item(item):
+                invalid_lines.append(line_number)
+                continue
+            yield item, line_offset, len(line)
+
+    if invalid_lines:
+        print(f"Warning: Skipped {len(invalid_lines)} invalid lines in file {file_path}, first one is line {invalid_lines[0]}")
+
+def read_jsonl_file(file_path):
+    """
+    Reads a JSONL file line by line and returns the list of valid templates.
+    """
+    if not os.access(file_path, os.R_OK):
+        print(f"Warning: No read permissions for file {file_path}")
+        return None
+
+    try:
+        return [item for item, _, _ in iterate_jsonl_file(file_path)]
+    except Exception as e:
+        print(f"An error occurred while reading {file_path}: {str(e)}")
+        return None
+
+def index_jsonl_file(file_path):
+    """
+    Reads a JSONL file line by line and returns (name, byte offset, byte length) for every valid template.
+    """
+    if not os.access(file_path, os.R_OK):
+        print(f"Warning: No read permissions for file {file_path}")
+        return None
+
+    try:
+        return [(item['name'], offset, length) for item, offset, length in iterate_jsonl_file(file_path)]
+    except Exception as e:
+        print(f"An error occurred while reading {file_path}: {str(e)}")
+        return None
+
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def index_json_file(file_path):
+    """
+    Reads a JSON file and returns (name, byte offset, byte length) for every template, without keeping the prompts.
+    Ensures content matches the expected format.
+    """
+    if file_path.endswith('.jsonl'):
+        return index_jsonl_file(file_path)
+
+    if not os.access(file_path, os.R_OK):
+        print(f"Warning: No read permissions for file {file_path}")
+        return None
+
+    try:
+        with open(file_path, 'rb') as file:
+            raw = file.read()
+        text = raw.decode('utf-8')
+        is_ascii = len(raw) == len(text)
+        decoder = json.JSONDecoder()
+        entries = []
+        # byte offsets are tracked incrementally, so every character is encoded only once
+        char_position = 0
+        byte_position = 0
+
+        position = JSON_WHITESPACE.match(text, 0).end()
+        if text[position:position + 1] != '[':
+            raise ValueError("expected a list of templates")
+        position = JSON_WHITESPACE.match(text, position + 1).end()
+
+        while text[position:position + 1] != ']':
+            item, end = decoder.raw_decode(text, position)
+            if not is_valid_style_item(item):
+                print(f"Warning: Invalid content in file {file_path}")
+                return None
+
+            if is_ascii:
+                offset, length = position, end - position
+            else:
+                offset = byte_position + len(text[char_position:position].encode('utf-8'))
+                length = len(text[position:end].encode('utf-8'))
+                char_position, byte_position = end, offset + length
+            entries.append((item['name'], offset, length))
+
+            position = JSON_WHITESPACE.match(text, end).end()
+            if text[position:position + 1] == ',':
+                position = JSON_WHITESPACE.match(text, position + 1).end()
+            elif text[position:position + 1] != ']':
+                raise ValueError(f"unexpected content at position {position}")
+
+        return entries
+    except Exception as e:
+        print(f"An error occurred while reading {file_path}: {str(e)}")
+        return None
+
+def read_json_template(file_path, offset, length):
+    """
+    Reads a single template from a JSON file, using the byte offset and length found by index_json_file.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            file.seek(offset)
+            return json.loads(file.read(length))
+    except Exception as e:
+        print(f"An error occurred while reading {file_path}: {str(e)}")
+        return None
+
 def read_sdxl_styles(json_data):
     """
     Returns style names from the provided JSON data.
@@ -105,39 +444,571 @@ def read_sdxl_styles(json_data):
 
     return [item['name'] for item in json_data if isinstance(item, dict) and 'name' in item]
 
+STYLE_FILE_EXTENSIONS = ('.json', '.jsonl')
+
 def get_all_json_files(directory):
     """
-    Returns all JSON files from the specified directory.
+    Returns all JSON and JSONL files from the specified directory.
+    """
+    return [os.path.join(directory, file) for file in os.listdir(directory) if file.endswith(STYLE_FILE_EXTENSIONS) and os.path.isfile(os.path.join(directory, file))]
+
+# Process-wide cache of parsed style catalogs, keyed by directory path.
+# Every entry remembers the (mtime, size) signature of each JSON file, so only changed files are parsed again.
+style_catalog_cache = {}
+style_catalog_cache_stats = {"hits": 0, "misses": 0, "files_parsed": 0, "bundle_loads": 0, "bundle_writes": 0, "shared_maps": 0, "shared_writes": 0}
+# the style directories are loaded on several threads at once
+style_catalog_cache_stats_lock = threading.Lock()
+
+def count_style_catalog_stat(name, amount=1):
+    with style_catalog_cache_stats_lock:
+        style_catalog_cache_stats[name] += amount
+
+# Compiled style bundle, stored next to the JSON files of a style directory.
+# It holds the compiled templates and signature of every file, so a cold start needs one read instead of parsing each file.
+# The bundle is plain JSON, style folders are filled with downloaded packs and a pickle in one of them could run any code.
+# Its name does not end in .json, so it is never read as a style file.
+STYLE_BUNDLE_FILENAME = ".sdxl_styles_bundle.cache"
+STYLE_BUNDLE_VERSION = 4
+
+# Lazy catalog mode only keeps style names and file offsets in memory.
+# Prompt bodies are read when a style is selected and the most recently used ones are kept in an LRU cache.
+STYLES_LAZY = os.environ.get("JPS_STYLES_LAZY", "0") == "1"
+STYLES_LRU_SIZE = int(os.environ.get("JPS_STYLES_LRU_SIZE", "256"))
+lazy_style_catalog_cache = {}
+
+class LRUCache:
+    """
+    Thread-safe least recently used cache with an entry limit and an optional byte budget.
+    A limit of 0 means unlimited; if both limits are 0 nothing is stored.
+    """
+    def __init__(self, max_entries, max_bytes=0, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        Stores value under key. size overrides the size given by sizeof, for entries whose key also takes memory.
+        """
+        if self.max_entries <= 0 and self.max_bytes <= 0:
+            return
+        if size is None:
+            size = self.sizeof(value) if self.sizeof is not None else 0
+        if self.max_bytes > 0 and size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while (self.max_entries > 0 and len(self.entries) > self.max_entries) or (self.max_bytes > 0 and self.total_bytes > self.max_bytes):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+style_template_cache = LRUCache(STYLES_LRU_SIZE)
+
+# Every catalog build gets a new version number, so cached styler results of replaced catalogs are never used again.
+style_catalog_versions = itertools.count(1)
+
+class LazyTemplateIndex:
+    """
+    Maps style names to templates like the template index of load_style_catalog, but reads each template from disk on demand.
+    """
+    __slots__ = ("references",)
+
+    def __init__(self, references):
+        # references: {unique name: (json_file, file signature, byte offset, byte length, original name)}
+        self.references = references
+
+    def __contains__(self, name):
+        return name in self.references
+
+    def __len__(self):
+        return len(self.references)
+
+    def get(self, name, default=None):
+        reference = self.references.get(name)
+        if reference is None:
+            return default
+
+        key = (name,) + reference[:4]
+        template = style_template_cache.get(key)
+        if template is None:
+            json_file, _, offset, length, original_name = reference
+            item = read_json_template(json_file, offset, length)
+            # the file may have changed since it was indexed; never return a different template
+            if not isinstance(item, dict) or item.get('name') != original_name or 'prompt' not in item:
+                return default
+            item['name'] = name
+            template = StyleTemplate(item)
+            style_template_cache.put(key, template)
+        return template
+
+def get_style_file_signature(file_path):
+    """
+    Returns the (mtime, size) signature of a style file or None if it can not be read.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def read_style_bundle(directory):
+    """
+    Returns the parsed files stored in the style bundle of a directory, as {json_file: (signature, json_data)}.
+    Returns an empty dictionary if there is no usable bundle.
+    """
+    bundle_path = os.path.join(directory, STYLE_BUNDLE_FILENAME)
+    try:
+        with open(bundle_path, 'r', encoding='utf-8') as file:
+            bundle = json.load(file)
+        if not isinstance(bundle, dict) or bundle.get("version") != STYLE_BUNDLE_VERSION:
+            return {}
+        # JSON has no tuples, signatures are turned back into tuples so they compare equal to the file signatures
+        files = {os.path.join(directory, file_name): (tuple(file_signature), None if templates is None else [StyleTemplate.from_fields(fields) for fields in templates])
+                 for file_name, (file_signature, templates) in bundle["files"].items()}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: Ignoring style bundle {bundle_path}: {str(e)}")
+        return {}
+
+    count_style_catalog_stat("bundle_loads")
+    return files
+
+def write_style_bundle(directory, files):
+    """
+    Writes the parsed files of a directory to its style bundle.
+    The bundle is replaced atomically, so other processes never read a partial file.
+    Templates are stored as tuples of their fields, so the bundle does not depend on the name this module was imported as.
+    """
+    bundle_path = os.path.join(directory, STYLE_BUNDLE_FILENAME)
+    temp_path = f"{bundle_path}.{os.getpid()}.tmp"
+    bundle = {
+        "version": STYLE_BUNDLE_VERSION,
+        "files": {os.path.basename(json_file): (file_signature, None if templates is None else [template.get_fields() for template in templates])
+                  for json_file, (file_signature, templates) in files.items() if file_signature is not None},
+    }
+
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(bundle, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, bundle_path)
+        count_style_catalog_stat("bundle_writes")
+    except Exception as e:
+        print(f"Warning: Could not write style bundle {bundle_path}: {str(e)}")
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def get_style_directory_signature(directory):
+    """
+    Returns ((json_file, signature), ...) for all JSON files of a style directory.
     """
-    return [os.path.join(directory, file) for file in os.listdir(directory) if file.endswith('.json') and os.path.isfile(os.path.join(directory, file))]
+    return tuple((json_file, get_style_file_signature(json_file)) for json_file in get_all_json_files(directory))
+
+def get_style_catalog_cache_stats():
+    """
+    Returns a copy of the style catalog cache counters.
+    """
+    with style_catalog_cache_stats_lock:
+        return dict(style_catalog_cache_stats)
+
+def build_template_index(json_data):
+    """
+    Returns a dictionary that maps template names to compiled StyleTemplate objects.
+    Templates without a name or prompt are skipped, so lookups need no further validation.
+    """
+    if not isinstance(json_data, list):
+        return {}
+
+    return {template['name']: StyleTemplate(template) for template in json_data if isinstance(template, dict) and 'name' in template and 'prompt' in template}
+
+# Style files are read on a bounded thread pool, which helps on network volumes where every open is slow.
+# Results are merged in directory order, so duplicate names get the same suffixes as with sequential loading.
+STYLES_LOAD_THREADS = int(os.environ.get("JPS_STYLES_LOAD_THREADS", "8"))
+style_loader_pool = None
+style_loader_pool_lock = threading.Lock()
+
+def get_style_loader_pool():
+    global style_loader_pool
+    with style_loader_pool_lock:
+        if style_loader_pool is None:
+            style_loader_pool = concurrent.futures.ThreadPoolExecutor(max_workers=STYLES_LOAD_THREADS, thread_name_prefix="JPS style loader")
+    return style_loader_pool
+
+style_directory_pool = None
+
+def get_style_directory_pool():
+    global style_directory_pool
+    with style_loader_pool_lock:
+        if style_directory_pool is None:
+            style_directory_pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(STYLE_CATALOG_DIRECTORIES), thread_name_prefix="JPS style directory")
+    return style_directory_pool
+
+def map_style_files(read_file, file_paths):
+    """
+    Applies read_file to every file, on the style loader thread pool if there is more than one file.
+    The results keep the order of file_paths.
+    """
+    if STYLES_LOAD_THREADS <= 1 or len(file_paths) <= 1:
+        return [read_file(file_path) for file_path in file_paths]
+
+    return list(get_style_loader_pool().map(read_file, file_paths))
+
+def read_style_files(signature, cached_files, read_file):
+    """
+    Returns {json_file: (signature, data)} for all files of a directory signature, in the same order, and the number of files read.
+    Unchanged files are taken from cached_files, the others are read with read_file.
+    """
+    changed_files = [json_file for json_file, file_signature in signature if file_signature is None or cached_files.get(json_file, (None,))[0] != file_signature]
+    changed_data = dict(zip(changed_files, map_style_files(read_file, changed_files)))
+
+    files = {json_file: (file_signature, changed_data[json_file] if json_file in changed_data else cached_files[json_file][1]) for json_file, file_signature in signature}
+
+    return files, len(changed_files)
 
 def load_styles_from_directory(directory):
     """
     Loads styles from all JSON files in the directory.
     Renames duplicate style names by appending a suffix.
+    The nodes use load_style_catalog instead, which caches compact templates.
     """
-    json_files = get_all_json_files(directory)
     combined_data = []
-    seen = set()
+    style_names = StyleNameDeduplicator()
 
-    for json_file in json_files:
+    for json_file in get_all_json_files(directory):
         json_data = read_json_file(json_file)
         if json_data:
             for item in json_data:
-                original_style = item['name']
-                style = original_style
-                suffix = 1
-                while style in seen:
-                    style = f"{original_style}_{suffix}"
-                    suffix += 1
-                item['name'] = style
-                seen.add(style)
+                item['name'] = style_names.make_unique(item['name'])
                 combined_data.append(item)
 
     unique_style_names = [item['name'] for item in combined_data if isinstance(item, dict) and 'name' in item]
     
     return combined_data, unique_style_names
 
+def read_style_templates(file_path):
+    """
+    Reads a JSON or JSONL file and returns its templates as StyleTemplate objects.
+    """
+    json_data = read_json_file(file_path)
+    if json_data is None:
+        return None
+
+    return [StyleTemplate(item) for item in json_data]
+
+def load_style_catalog(directory):
+    """
+    Loads the style catalog of a directory, containing the unique style names and an index of compiled templates.
+    Templates are kept once per file, the index refers to the same objects under their unique names.
+    Results are cached per directory and only rebuilt if a file was added, removed or changed.
+    On a cold start, unchanged files are taken from the style bundle and the bundle is refreshed if it was stale.
+    """
+    signature = get_style_directory_signature(directory)
+
+    cached = style_catalog_cache.get(directory)
+    if cached is not None and cached["signature"] == signature:
+        count_style_catalog_stat("hits")
+        return cached
+
+    count_style_catalog_stat("misses")
+    cached_files = cached["files"] if cached is not None else read_style_bundle(directory)
+    files, files_parsed = read_style_files(signature, cached_files, read_style_templates)
+    template_index = {}
+    style_names = StyleNameDeduplicator()
+    # only needed while loading, the templates keep the shared strings
+    string_pool = {}
+
+    for json_file, (file_signature, templates) in files.items():
+        if templates:
+            for template in templates:
+                template.share_strings(string_pool)
+                template_index[style_names.make_unique(template.name)] = template
+
+    count_style_catalog_stat("files_parsed", files_parsed)
+    if files_parsed or files.keys() != cached_files.keys():
+        write_style_bundle(directory, files)
+
+    catalog = {
+        "signature": signature,
+        "files": files,
+        "style_names": list(template_index),
+        "template_index": template_index,
+        "renamed_styles": style_names.renamed,
+        "version": next(style_catalog_versions),
+    }
+    style_catalog_cache[directory] = catalog
+
+    return catalog
+
+def load_lazy_style_catalog(directory):
+    """
+    Loads the style catalog of a directory in lazy mode: the unique style names and a LazyTemplateIndex.
+    Only names and file offsets are kept in memory.
+    """
+    signature = get_style_directory_signature(directory)
+
+    cached = lazy_style_catalog_cache.get(directory)
+    if cached is not None and cached["signature"] == signature:
+        count_style_catalog_stat("hits")
+        return cached
+
+    count_style_catalog_stat("misses")
+    cached_files = cached["files"] if cached is not None else {}
+    files, files_parsed = read_style_files(signature, cached_files, index_json_file)
+    count_style_catalog_stat("files_parsed", files_parsed)
+    references = {}
+    style_names = StyleNameDeduplicator()
+
+    for json_file, (file_signature, entries) in files.items():
+        if entries:
+            for original_style, offset, length in entries:
+                style = style_names.make_unique(original_style)
+                references[style] = (json_file, file_signature, offset, length, original_style)
+
+    catalog = {
+        "signature": signature,
+        "files": files,
+        "style_names": list(references),
+        "template_index": LazyTemplateIndex(references),
+        "renamed_styles": style_names.renamed,
+        "version": next(style_catalog_versions),
+    }
+    lazy_style_catalog_cache[directory] = catalog
+
+    return catalog
+
+# Shared catalog mode, for several ComfyUI processes on one host.
+# Every style directory is compiled once into a catalog file in JPS_STYLES_SHARED_CACHE_DIR, that all processes map read-only.
+# A process only keeps the style names, prompts are read from the mapping when a style is selected.
+# Layout: header, directory signature (JSON), unique style names (JSON), record offsets (uint64) and one JSON record per style.
+STYLES_SHARED_CACHE_DIR = os.environ.get("JPS_STYLES_SHARED_CACHE_DIR", "")
+SHARED_CATALOG_MAGIC = b"JPSSTYL1"
+SHARED_CATALOG_HEADER = struct.Struct("<8sQQQQ")
+SHARED_CATALOG_OFFSETS = struct.Struct("<QQ")
+shared_style_catalog_cache = {}
+
+class MappedTemplateIndex:
+    """
+    Maps style names to templates like the template index of load_style_catalog, but reads each template from a mapped shared catalog file.
+    """
+    __slots__ = ("mapped", "positions", "offsets_start", "records_start", "key")
+
+    def __init__(self, mapped, style_names, offsets_start, records_start, key):
+        self.mapped = mapped
+        self.positions = {name: position for position, name in enumerate(style_names)}
+        self.offsets_start = offsets_start
+        self.records_start = records_start
+        # (file path, inode, mtime) of the mapped file, templates of a rebuilt file get new cache keys
+        self.key = key
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get(self, name, default=None):
+        position = self.positions.get(name)
+        if position is None:
+            return default
+
+        key = (name,) + self.key
+        template = style_template_cache.get(key)
+        if template is None:
+            start, end = SHARED_CATALOG_OFFSETS.unpack_from(self.mapped, self.offsets_start + 8 * position)
+            template = StyleTemplate(json.loads(self.mapped[self.records_start + start:self.records_start + end]))
+            style_template_cache.put(key, template)
+        return template
+
+def get_shared_style_catalog_path(directory):
+    """
+    Returns the path of the shared catalog file of a style directory.
+    """
+    directory_hash = hashlib.blake2b(os.path.realpath(directory).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(STYLES_SHARED_CACHE_DIR, f"{os.path.basename(directory)}-{directory_hash}.jpsstyles")
+
+def get_shared_signature(signature):
+    # the directory signature as stored in the shared catalog file, file names without the directory
+    return [[os.path.basename(json_file), list(file_signature) if file_signature is not None else None] for json_file, file_signature in signature]
+
+def write_shared_style_catalog(path, signature):
+    """
+    Parses the files of a directory signature and writes them to a shared catalog file.
+    The file is replaced atomically, processes that still map the old file keep using it.
+    The temp file is created before the files are parsed, so a cache directory that can not be written costs no parsing.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, 'wb') as file:
+            files, files_parsed = read_style_files(signature, {}, read_json_file)
+            count_style_catalog_stat("files_parsed", files_parsed)
+            style_names = StyleNameDeduplicator()
+            names = []
+            records = []
+            offsets = [0]
+
+            for json_file, (file_signature, json_data) in files.items():
+                if json_data:
+                    for item in json_data:
+                        item = dict(item, name=style_names.make_unique(item['name']))
+                        names.append(item['name'])
+                        records.append(json.dumps(item, ensure_ascii=False).encode('utf-8'))
+                        offsets.append(offsets[-1] + len(records[-1]))
+
+            signature_data = json.dumps(get_shared_signature(signature)).encode('utf-8')
+            names_data = json.dumps(names, ensure_ascii=False).encode('utf-8')
+            header = SHARED_CATALOG_HEADER.pack(SHARED_CATALOG_MAGIC, len(signature_data), len(names_data), len(names), style_names.renamed)
+            # the offsets start at a multiple of 8 bytes
+            padding = b"\0" * (-(len(header) + len(signature_data) + len(names_data)) % 8)
+
+            file.write(header + signature_data + names_data + padding)
+            file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            file.writelines(records)
+        os.replace(temp_path, path)
+        count_style_catalog_stat("shared_writes")
+        return True
+    except Exception as e:
+        print(f"Warning: Could not write shared style catalog {path}: {str(e)}")
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def map_shared_style_catalog(path, signature):
+    """
+    Maps a shared catalog file and returns its catalog, or None if there is no file or it does not match the directory signature.
+    """
+    try:
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring shared style catalog {path}: {str(e)}")
+        return None
+
+    try:
+        magic, signature_length, names_length, count, renamed_styles = SHARED_CATALOG_HEADER.unpack_from(mapped, 0)
+        position = SHARED_CATALOG_HEADER.size
+        if magic != SHARED_CATALOG_MAGIC or json.loads(mapped[position:position + signature_length]) != get_shared_signature(signature):
+            mapped.close()
+            return None
+        position += signature_length
+        style_names = json.loads(mapped[position:position + names_length])
+        position += names_length
+        offsets_start = position + (-position % 8)
+        records_start = offsets_start + 8 * (count + 1)
+        if len(style_names) != count or records_start > len(mapped):
+            raise ValueError("truncated file")
+    except (struct.error, ValueError) as e:
+        print(f"Warning: Ignoring shared style catalog {path}: {str(e)}")
+        mapped.close()
+        return None
+
+    count_style_catalog_stat("shared_maps")
+    return {
+        "signature": signature,
+        "style_names": style_names,
+        "template_index": MappedTemplateIndex(mapped, style_names, offsets_start, records_start, (path, stat.st_ino, stat.st_mtime_ns)),
+        "renamed_styles": renamed_styles,
+        "version": next(style_catalog_versions),
+    }
+
+def load_shared_style_catalog(directory):
+    """
+    Loads the style catalog of a directory in shared mode: the unique style names and a MappedTemplateIndex.
+    The shared catalog file is only built if it is missing or outdated, usually by the first process that starts.
+    Falls back to load_style_catalog if the file can not be written, the fallback is kept until the directory changes,
+    so the file is not tried again on every call.
+    """
+    signature = get_style_directory_signature(directory)
+
+    cached = shared_style_catalog_cache.get(directory)
+    if cached is not None and cached["signature"] == signature:
+        count_style_catalog_stat("hits")
+        return cached
+
+    count_style_catalog_stat("misses")
+    path = get_shared_style_catalog_path(directory)
+    # another process may already have built the file for this signature
+    catalog = map_shared_style_catalog(path, signature)
+    if catalog is None and write_shared_style_catalog(path, signature):
+        catalog = map_shared_style_catalog(path, signature)
+    if catalog is None:
+        catalog = load_style_catalog(directory)
+
+    shared_style_catalog_cache[directory] = catalog
+
+    return catalog
+
+class StyleNameDeduplicator:
+    """
+    Renames duplicate style names by appending the first free "_1", "_2", ... suffix.
+    The next suffix to try is remembered per name, so thousands of entries with the same name take linear time.
+    """
+    def __init__(self):
+        self.seen = set()
+        self.next_suffix = {}
+        self.renamed = 0
+
+    def make_unique(self, original_style):
+        """
+        Returns original_style, or the renamed style if the name was seen before.
+        """
+        style = original_style
+        if style in self.seen:
+            # names only get added, so all suffixes below next_suffix are still taken
+            suffix = self.next_suffix.get(original_style, 1)
+            style = f"{original_style}_{suffix}"
+            while style in self.seen:
+                suffix += 1
+                style = f"{original_style}_{suffix}"
+            self.next_suffix[original_style] = suffix + 1
+            self.renamed += 1
+        self.seen.add(style)
+        return style
+
 def validate_json_data(json_data):
     """
     Validates the structure of the JSON data.
@@ -196,13 +1067,75 @@ def replace_prompts_in_template(template, positive_prompt_g, positive_prompt_l,
 
     return text_g_positive, text_l_positive, text_negative
 
+class StyleTemplate:
+    """
+    A style template that is split once when the catalog is loaded.
+    The g prompt is stored as the fragments around '{prompt}', so rendering is a single join instead of split_template and replace.
+    """
+    __slots__ = ("name", "prompt_g_fragments", "prompt_l", "negative_prompt", "weight")
+
+    def __init__(self, template):
+        template_prompt_g, template_prompt_l = split_template(template['prompt'])
+        self.name = template['name']
+        self.prompt_g_fragments = tuple(template_prompt_g.split("{prompt}"))
+        self.prompt_l = template_prompt_l
+        self.negative_prompt = template.get('negative_prompt', "")
+        # optional sampling weight, used by SDXL Prompt Styler Random
+        self.weight = template.get('weight', 1.0)
+
+    def get_fields(self):
+        return tuple(getattr(self, field) for field in StyleTemplate.__slots__)
+
+    @classmethod
+    def from_fields(cls, fields):
+        """
+        Returns a template with the fields of get_fields, as stored in the style bundle.
+        Raises ValueError or TypeError if the fields do not have the types of a loaded template.
+        """
+        name, prompt_g_fragments, prompt_l, negative_prompt, weight = fields
+        if type(name) is not str or type(prompt_l) is not str or type(prompt_g_fragments) is not list:
+            raise ValueError(f"Invalid template fields for '{name}'")
+        # fails unless all fragments are strings
+        "".join(prompt_g_fragments)
+
+        template = cls.__new__(cls)
+        template.name = name
+        template.prompt_g_fragments = tuple(prompt_g_fragments)
+        template.prompt_l = prompt_l
+        template.negative_prompt = negative_prompt
+        template.weight = weight
+        return template
+
+    def share_strings(self, string_pool):
+        """
+        Replaces the prompt strings with equal strings from string_pool, adding new ones,
+        so text repeated across templates (negative prompts, common prefixes) is stored once.
+        """
+        self.prompt_g_fragments = tuple(string_pool.setdefault(fragment, fragment) for fragment in self.prompt_g_fragments)
+        self.prompt_l = string_pool.setdefault(self.prompt_l, self.prompt_l)
+        if type(self.negative_prompt) is str:
+            self.negative_prompt = string_pool.setdefault(self.negative_prompt, self.negative_prompt)
+
+    def render(self, positive_prompt_g, positive_prompt_l, negative_prompt):
+        """
+        Returns the same main positive, auxiliary positive and negative prompts as replace_prompts_in_template.
+        """
+        text_g_positive = positive_prompt_g.join(self.prompt_g_fragments)
+
+        template_prompt_l = self.prompt_l
+        text_l_positive = f"{template_prompt_l}, {positive_prompt_l}" if template_prompt_l and positive_prompt_l else template_prompt_l or positive_prompt_l
+
+        json_negative_prompt = self.negative_prompt
+        text_negative = f"{json_negative_prompt}, {negative_prompt}" if json_negative_prompt and negative_prompt else json_negative_prompt or negative_prompt
+
+        return text_g_positive, text_l_positive, text_negative
 
 def read_sdxl_templates_replace_and_combine(json_data, template_name, positive_prompt_g, positive_prompt_l, negative_prompt):
     """
     Find a specific template by its name, then replace and combine its placeholders with the provided prompts in an advanced manner.
     
     Args:
-    - json_data (list): The list of templates.
+    - json_data (dict or list): An index of compiled templates, as built by load_style_catalog or build_template_index, or the list of templates.
     - template_name (str): The name of the desired template.
     - positive_prompt_g (str): The main positive prompt.
     - positive_prompt_l (str): The auxiliary positive prompt.
@@ -211,16 +1144,470 @@ def read_sdxl_templates_replace_and_combine(json_data, template_name, positive_p
     Returns:
     - tuple: A tuple containing the replaced and combined main positive, auxiliary positive, combined positive and negative prompts.
     """
-    if not validate_json_data(json_data):
+    if isinstance(json_data, (dict, LazyTemplateIndex, MappedTemplateIndex)):
+        template = json_data.get(template_name)
+    elif validate_json_data(json_data):
+        template = find_template_by_name(json_data, template_name)
+    else:
         return positive_prompt_g, positive_prompt_l, negative_prompt
 
-    template = find_template_by_name(json_data, template_name)
-
-    if template:
+    if isinstance(template, StyleTemplate):
+        return template.render(positive_prompt_g, positive_prompt_l, negative_prompt)
+    elif template:
         return replace_prompts_in_template(template, positive_prompt_g, positive_prompt_l, negative_prompt)
     else:
         return positive_prompt_g, positive_prompt_l, negative_prompt
 
+STYLES_DIRECTORY = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'styles')
+
+UNIVERSAL_NEGATIVE_PROMPT = 'text, watermark, low-quality, signature, moire pattern, downsampling, aliasing, distorted, blurry, glossy, blur, jpeg artifacts, compression artifacts, poorly drawn, low-resolution, bad, distortion, twisted, excessive, exaggerated pose, exaggerated limbs, grainy, symmetrical, duplicate, error, pattern, beginner, pixelated, fake, hyper, glitch, overexposed, high-contrast, bad-contrast'
+
+STYLE_CATALOG_DIRECTORIES = {
+    "artists": os.path.join(STYLES_DIRECTORY, 'artists'),
+    "movies": os.path.join(STYLES_DIRECTORY, 'movies'),
+    "styles": os.path.join(STYLES_DIRECTORY, 'main'),
+}
+
+# Optional background watcher, that reloads changed style files instead of checking them on every INPUT_TYPES call.
+STYLES_WATCH = os.environ.get("JPS_STYLES_WATCH", "0") == "1"
+STYLES_WATCH_INTERVAL = float(os.environ.get("JPS_STYLES_WATCH_INTERVAL", "2"))
+style_catalog_lock = threading.RLock()
+style_directory_watcher = None
+
+def load_sdxl_style_catalogs():
+    """
+    Loads the artist, movie and style catalogs used by the SDXL Prompt Styler nodes.
+    Returns a dictionary with the keys "artists", "movies" and "styles".
+    """
+    if STYLES_SHARED_CACHE_DIR:
+        load_catalog = load_shared_style_catalog
+    elif STYLES_LAZY:
+        load_catalog = load_lazy_style_catalog
+    else:
+        load_catalog = load_style_catalog
+
+    with style_catalog_lock:
+        if STYLES_LOAD_THREADS <= 1:
+            return {key: load_catalog(directory) for key, directory in STYLE_CATALOG_DIRECTORIES.items()}
+
+        # the directories are loaded side by side on a pool that is kept for later calls, their files share the style loader pool
+        executor = get_style_directory_pool()
+        futures = {key: executor.submit(load_catalog, directory) for key, directory in STYLE_CATALOG_DIRECTORIES.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+def get_sdxl_style_catalogs():
+    """
+    Returns the current style catalogs: the ones kept up to date by the style directory watcher if it runs, freshly checked ones otherwise.
+    """
+    # a watcher thread that stopped would keep returning outdated catalogs
+    if style_directory_watcher is not None and style_directory_watcher.thread.is_alive():
+        return style_directory_watcher.style_catalogs
+
+    return load_sdxl_style_catalogs()
+
+class StyleDirectoryWatcher:
+    """
+    Background thread that watches the style directories and reloads the catalogs when a JSON file changes.
+    Uses inotify if inotify_simple is installed and polls the file signatures otherwise.
+    Only changed files are parsed again, the new catalogs replace the old ones in a single assignment,
+    so running styler calls keep using a complete catalog.
+    """
+    def __init__(self, interval=STYLES_WATCH_INTERVAL):
+        self.interval = interval
+        self.mode = "inotify" if inotify_simple is not None else "polling"
+        self.style_catalogs = load_sdxl_style_catalogs()
+        self.reloads = 0
+        self.errors = 0
+        self.last_reload_seconds = 0.0
+        self.total_reload_seconds = 0.0
+        self.inotify = None
+        self.thread = threading.Thread(target=self.run, name="JPS style watcher", daemon=True)
+
+    def start(self):
+        if self.mode == "inotify":
+            # watches are added before start returns, so no change after this call is missed
+            self.inotify = inotify_simple.INotify()
+            watch_flags = inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.CREATE | inotify_simple.flags.DELETE | inotify_simple.flags.MOVED_FROM | inotify_simple.flags.MOVED_TO
+            for directory in STYLE_CATALOG_DIRECTORIES.values():
+                self.inotify.add_watch(directory, watch_flags)
+        self.thread.start()
+
+    def reload(self):
+        start = time.perf_counter()
+        try:
+            style_catalogs = load_sdxl_style_catalogs()
+        except Exception as e:
+            self.errors += 1
+            print(f"An error occurred while reloading styles: {str(e)}")
+            return
+        self.style_catalogs = style_catalogs
+        self.last_reload_seconds = time.perf_counter() - start
+        self.total_reload_seconds += self.last_reload_seconds
+        self.reloads += 1
+
+    def run(self):
+        if self.mode == "inotify":
+            self.watch_inotify()
+        else:
+            self.watch_polling()
+
+    def watch_polling(self):
+        while True:
+            # compared with the signatures the current catalogs were loaded with,
+            # so changes made before the thread started are found and a failed reload is tried again
+            signatures = {key: catalog["signature"] for key, catalog in self.style_catalogs.items()}
+            time.sleep(self.interval)
+            try:
+                current = {key: get_style_directory_signature(directory) for key, directory in STYLE_CATALOG_DIRECTORIES.items()}
+                if current != signatures:
+                    self.reload()
+            except Exception as e:
+                # for example a style directory that is briefly missing
+                self.errors += 1
+                print(f"An error occurred while watching styles: {str(e)}")
+
+    def watch_inotify(self):
+        while True:
+            try:
+                events = self.inotify.read()
+                # editors often write a file in several steps, wait a moment to handle them with one reload
+                events += self.inotify.read(timeout=100)
+                if any(event.mask & inotify_simple.flags.IGNORED for event in events):
+                    # a watched directory was removed, its watch is gone; polling also finds the directory when it comes back
+                    print("Warning: A style directory was removed, watching styles by polling")
+                    self.mode = "polling"
+                    self.reload()
+                    return self.watch_polling()
+                if any(event.name.endswith(STYLE_FILE_EXTENSIONS) for event in events):
+                    self.reload()
+            except Exception as e:
+                self.errors += 1
+                print(f"An error occurred while watching styles: {str(e)}")
+                time.sleep(self.interval)
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_reload_seconds": self.last_reload_seconds,
+            "total_reload_seconds": self.total_reload_seconds,
+        }
+
+def start_style_directory_watcher():
+    """
+    Starts the style directory watcher once and returns it.
+    """
+    global style_directory_watcher
+    with style_catalog_lock:
+        if style_directory_watcher is None:
+            watcher = StyleDirectoryWatcher()
+            watcher.start()
+            style_directory_watcher = watcher
+    return style_directory_watcher
+
+def get_style_names_from_lines(text_list, catalog):
+    """
+    Returns the style names from a list of texts with one name per line.
+    A line with "*" selects every style of the catalog, empty lines are ignored.
+    """
+    names = []
+    for text in text_list:
+        for line in text.splitlines():
+            line = line.strip()
+            if line == "*":
+                names.extend(catalog["style_names"])
+            elif line:
+                names.append(line)
+    return names
+
+def apply_style_stage(template_index, template_name, positive_prompt_g, positive_prompt_l, negative_prompt):
+    """
+    Applies one template of the styler chain (artist, movie or style).
+    If the g and l prompts were identical, the result is kept in sync, so the style is not applied twice.
+    """
+    text_g_positive, text_l_positive, text_negative = read_sdxl_templates_replace_and_combine(template_index, template_name, positive_prompt_g, positive_prompt_l, negative_prompt)
+
+    if(positive_prompt_g == positive_prompt_l):
+        if(text_l_positive != positive_prompt_l and text_g_positive != positive_prompt_g):
+            text_g_positive, text_l_positive, text_negative = read_sdxl_templates_replace_and_combine(template_index, template_name, positive_prompt_g, "", negative_prompt)
+        elif(text_g_positive != positive_prompt_g):
+            text_l_positive = text_g_positive
+        elif(text_l_positive != positive_prompt_l):
+            text_g_positive = text_l_positive
+
+    return text_g_positive, text_l_positive, text_negative
+
+def style_sdxl_prompts(style_catalogs, text_positive_g, text_positive_l, text_negative, artist, movie, style, universal_neg):
+    """
+    Applies the artist, movie and style templates to the prompts, in this order.
+
+    Returns:
+    - tuple: The styled main positive, auxiliary positive, combined positive and negative prompts.
+    """
+    text_pos_g_artist, text_pos_l_artist, text_neg_artist = apply_style_stage(style_catalogs["artists"]["template_index"], artist, text_positive_g, text_positive_l, text_negative)
+    text_pos_g_movie, text_pos_l_movie, text_neg_movie = apply_style_stage(style_catalogs["movies"]["template_index"], movie, text_pos_g_artist, text_pos_l_artist, text_negative)
+    text_pos_g_style, text_pos_l_style, text_neg_style = apply_style_stage(style_catalogs["styles"]["template_index"], style, text_pos_g_movie, text_pos_l_movie, text_neg_movie)
+
+    return combine_sdxl_prompts(text_pos_g_style, text_pos_l_style, text_neg_style, universal_neg)
+
+def combine_sdxl_prompts(text_pos_g_style, text_pos_l_style, text_neg_style, universal_neg):
+    """
+    Builds the combined positive prompt and adds the universal negative prompt if universal_neg is "ON".
+
+    Returns:
+    - tuple: The main positive, auxiliary positive, combined positive and negative prompts.
+    """
+    if(text_pos_g_style != text_pos_l_style):
+        if(text_pos_l_style != ""):
+            text_pos_style = text_pos_g_style + ' . ' + text_pos_l_style
+        else:
+            text_pos_style = text_pos_g_style 
+    else:
+        text_pos_style = text_pos_g_style 
+
+    if(universal_neg == "ON"):
+        if (text_neg_style != ''):
+            text_neg_style = text_neg_style + ', ' + UNIVERSAL_NEGATIVE_PROMPT
+        else:
+            text_neg_style = UNIVERSAL_NEGATIVE_PROMPT
+
+    return text_pos_g_style, text_pos_l_style, text_pos_style, text_neg_style
+
+STYLE_CATALOG_ALIASES = {
+    "artist": "artists", "artists": "artists",
+    "movie": "movies", "movies": "movies",
+    "style": "styles", "styles": "styles", "main": "styles",
+}
+
+def parse_style_stack(text):
+    """
+    Parses one "catalog: name" pair per line, for example "artists: Bo Chen", into a list of (catalog, name) tuples.
+    Empty lines are ignored.
+    """
+    style_stack = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        catalog_key, separator, name = line.partition(":")
+        catalog_key = STYLE_CATALOG_ALIASES.get(catalog_key.strip().lower())
+        if not separator or catalog_key is None:
+            raise ValueError(f"Invalid style line '{line.strip()}', expected 'artists: name', 'movies: name' or 'styles: name'")
+        style_stack.append((catalog_key, name.strip()))
+    return style_stack
+
+def stack_sdxl_styles(style_catalogs, style_stack, text_positive_g, text_positive_l, text_negative, universal_neg):
+    """
+    Applies any number of (catalog, name) templates in the given order, with the same g/l handling as the artist, movie and style chain.
+    The negative prompts of all templates are kept.
+
+    Returns:
+    - tuple: The styled main positive, auxiliary positive, combined positive and negative prompts.
+    """
+    text_pos_g, text_pos_l, text_neg = text_positive_g, text_positive_l, text_negative
+    for catalog_key, name in style_stack:
+        text_pos_g, text_pos_l, text_neg = apply_style_stage(style_catalogs[catalog_key]["template_index"], name, text_pos_g, text_pos_l, text_neg)
+
+    return combine_sdxl_prompts(text_pos_g, text_pos_l, text_neg, universal_neg)
+
+# Number of style names sent to the combo widgets, 0 sends all. Other names can be found with the style search route.
+STYLES_COMBO_LIMIT = int(os.environ.get("JPS_STYLES_COMBO_LIMIT", "0"))
+
+SEARCH_TOKEN = re.compile(r'\w+')
+
+class StyleSearchIndex:
+    """
+    Search index over the names and prompts of a style catalog.
+    Name prefixes are found with a binary search over the sorted names, words with an inverted index.
+    In lazy and shared catalog mode only the names are indexed.
+    """
+    def __init__(self, catalog):
+        self.style_names = catalog["style_names"]
+        self.sorted_names = sorted((name.lower(), position) for position, name in enumerate(self.style_names))
+
+        template_index = catalog["template_index"]
+        postings = {}
+        for position, name in enumerate(self.style_names):
+            text = name
+            if isinstance(template_index, dict):
+                template = template_index[name]
+                text = " ".join([name, *template.prompt_g_fragments, template.prompt_l])
+            for token in set(SEARCH_TOKEN.findall(text.lower())):
+                postings.setdefault(token, []).append(position)
+        self.postings = postings
+        self.sorted_tokens = sorted(postings)
+        self.template_index = template_index
+        self.cumulative_weights = None
+
+    def get_prefix_range(self, prefix):
+        """
+        Returns the range of sorted_names that start with the lower case prefix.
+        """
+        start = bisect.bisect_left(self.sorted_names, (prefix,))
+        end = bisect.bisect_left(self.sorted_names, (prefix + '\U0010ffff',), start)
+        return start, end
+
+    def get_prefix_positions(self, prefix):
+        start, end = self.get_prefix_range(prefix)
+        return [position for _, position in self.sorted_names[start:end]]
+
+    def get_cumulative_weights(self):
+        # running sum of the template weights in sorted_names order, built on first use
+        if self.cumulative_weights is None:
+            cumulative_weights = []
+            total = 0.0
+            for _, position in self.sorted_names:
+                weight = 1.0
+                if isinstance(self.template_index, dict):
+                    try:
+                        weight = max(float(self.template_index[self.style_names[position]].weight), 0.0)
+                    except (TypeError, ValueError):
+                        pass
+                total += weight
+                cumulative_weights.append(total)
+            self.cumulative_weights = cumulative_weights
+        return self.cumulative_weights
+
+    def sample(self, rnd, start, end, count, weighted=False):
+        """
+        Returns count different indexes of sorted_names from the range start to end, count must not exceed the range.
+        Weighted sampling draws with a binary search over the cumulative weights.
+        """
+        if not weighted:
+            return rnd.sample(range(start, end), count)
+
+        cumulative_weights = self.get_cumulative_weights()
+        base = cumulative_weights[start - 1] if start > 0 else 0.0
+        total = cumulative_weights[end - 1] - base
+        if total <= 0:
+            return rnd.sample(range(start, end), count)
+
+        def weight(index):
+            return cumulative_weights[index] - (cumulative_weights[index - 1] if index > 0 else 0.0)
+
+        if 2 * count <= end - start:
+            # picks are returned in draw order, so the batch position does not depend on the name order
+            picked = []
+            seen = set()
+            for _ in range(20 * count):
+                index = min(bisect.bisect_right(cumulative_weights, base + rnd.random() * total, start, end), end - 1)
+                if index not in seen:
+                    seen.add(index)
+                    picked.append(index)
+                    if len(picked) == count:
+                        return picked
+
+        # most of the range is needed, or a few heavy weights keep getting drawn again:
+        # weighted random keys (Efraimidis-Spirakis) over the whole range
+        keys = [(rnd.random() ** (1.0 / weight(index)) if weight(index) > 0 else 0.0, index) for index in range(start, end)]
+        keys.sort(reverse=True)
+        return [index for _, index in keys[:count]]
+
+    def get_token_positions(self, tokens):
+        # all words must match, the last one may be incomplete
+        matches = None
+        for token in tokens[:-1]:
+            positions = set(self.postings.get(token, ()))
+            matches = positions if matches is None else matches & positions
+
+        last_token = tokens[-1]
+        positions = set()
+        index = bisect.bisect_left(self.sorted_tokens, last_token)
+        while index < len(self.sorted_tokens) and self.sorted_tokens[index].startswith(last_token):
+            positions.update(self.postings[self.sorted_tokens[index]])
+            index += 1
+        matches = positions if matches is None else matches & positions
+
+        return sorted(matches)
+
+    def search(self, query, offset=0, limit=50):
+        """
+        Returns the total number of matches and one page of style names.
+        Names starting with the query come first, followed by the other names or prompts containing all query words.
+        """
+        query = query.strip().lower()
+        if not query:
+            return len(self.style_names), self.style_names[offset:offset + limit]
+
+        positions = self.get_prefix_positions(query)
+        tokens = SEARCH_TOKEN.findall(query)
+        if tokens:
+            seen = set(positions)
+            positions += [position for position in self.get_token_positions(tokens) if position not in seen]
+
+        return len(positions), [self.style_names[position] for position in positions[offset:offset + limit]]
+
+def get_style_search_index(catalog):
+    """
+    Returns the search index of a catalog, it is built on first use.
+    """
+    search_index = catalog.get("search_index")
+    if search_index is None:
+        search_index = StyleSearchIndex(catalog)
+        catalog["search_index"] = search_index
+    return search_index
+
+def sample_style_names(catalog, rnd, count, prefix="", weighted=False):
+    """
+    Samples count style names without replacement, optionally only names starting with prefix (case-insensitive)
+    and weighted by the "weight" of the templates. If count is larger than the number of matching names,
+    sampling starts over once all of them were used. Returns empty names if nothing matches.
+    """
+    search_index = get_style_search_index(catalog)
+    start, end = search_index.get_prefix_range(prefix.strip().lower())
+    if start == end:
+        return [""] * count
+
+    names = []
+    while len(names) < count:
+        indexes = search_index.sample(rnd, start, end, min(count - len(names), end - start), weighted)
+        names += [search_index.style_names[search_index.sorted_names[index][1]] for index in indexes]
+    return names
+
+def search_styles(query, catalog_key=None, offset=0, limit=50):
+    """
+    Searches one catalog ("artists", "movies" or "styles") or all of them.
+    Returns {"total": ..., "results": [{"catalog": ..., "name": ...}, ...]}.
+    """
+    style_catalogs = get_sdxl_style_catalogs()
+    keys = [catalog_key] if catalog_key else list(style_catalogs)
+
+    total = 0
+    results = []
+    for key in keys:
+        count, names = get_style_search_index(style_catalogs[key]).search(query, max(offset - total, 0), limit - len(results))
+        results += [{"catalog": key, "name": name} for name in names]
+        total += count
+
+    return {"total": total, "results": results}
+
+# Memoized styler results, for API clients that send the same prompts and styles again and again.
+STYLER_CACHE_SIZE = int(os.environ.get("JPS_STYLER_CACHE_SIZE", "1024"))
+STYLER_CACHE_MB = int(os.environ.get("JPS_STYLER_CACHE_MB", "16"))
+
+def get_styler_result_size(result):
+    return sum(sys.getsizeof(text) for text in result)
+
+def get_styler_entry_size(key, result):
+    # the key holds the full prompts, which can be as large as the result
+    return sys.getsizeof(key) + sum(sys.getsizeof(value) for value in key) + sys.getsizeof(result) + get_styler_result_size(result)
+
+styler_result_cache = LRUCache(STYLER_CACHE_SIZE, STYLER_CACHE_MB * 1024 * 1024, get_styler_result_size)
+
+def style_sdxl_prompts_cached(style_catalogs, text_positive_g, text_positive_l, text_negative, artist, movie, style, universal_neg):
+    """
+    Same as style_sdxl_prompts, but results are kept in styler_result_cache.
+    The key includes the catalog versions, so a reloaded catalog never returns stale results.
+    """
+    catalog_versions = (style_catalogs["artists"]["version"], style_catalogs["movies"]["version"], style_catalogs["styles"]["version"])
+    key = (text_positive_g, text_positive_l, text_negative, artist, movie, style, universal_neg, catalog_versions)
+
+    result = styler_result_cache.get(key)
+    if result is None:
+        result = style_sdxl_prompts(style_catalogs, text_positive_g, text_positive_l, text_negative, artist, movie, style, universal_neg)
+        styler_result_cache.put(key, result, get_styler_entry_size(key, result))
+    return result
+
 accepted_ratios_horizontal = {
     "12:5": (1536, 640, 2.400000000),
     "7:4": (1344, 768, 1.750000000),
@@ -2222,10 +3609,14 @@ class SDXL_Prompt_Styler:
 
     @classmethod
     def INPUT_TYPES(self):
-        current_directory = os.path.dirname(os.path.realpath(__file__))
-        self.json_data_artists, artists = load_styles_from_directory(os.path.join(current_directory, 'styles', 'artists'))
-        self.json_data_movies, movies = load_styles_from_directory(os.path.join(current_directory, 'styles', 'movies'))
-        self.json_data_styles, styles = load_styles_from_directory(os.path.join(current_directory, 'styles', 'main'))
+        self.style_catalogs = get_sdxl_style_catalogs()
+
+        artists = self.style_catalogs["artists"]["style_names"]
+        movies = self.style_catalogs["movies"]["style_names"]
+        styles = self.style_catalogs["styles"]["style_names"]
+
+        if STYLES_COMBO_LIMIT > 0:
+            artists, movies, styles = artists[:STYLES_COMBO_LIMIT], movies[:STYLES_COMBO_LIMIT], styles[:STYLES_COMBO_LIMIT]
         
         return {
             "required": {
@@ -2244,67 +3635,231 @@ class SDXL_Prompt_Styler:
     FUNCTION = 'sdxlpromptstyler'
     CATEGORY = 'JPS Nodes/Style'
 
+    @classmethod
+    def VALIDATE_INPUTS(s, artist=None, movie=None, style=None):
+        # replaces the combo check, so names found with the style search are accepted even if the combo list is truncated;
+        # styles linked from another node are not known yet and arrive as None, they are not checked
+        style_catalogs = get_sdxl_style_catalogs()
+        for key, name in (("artists", artist), ("movies", movie), ("styles", style)):
+            if name is not None and name not in style_catalogs[key]["template_index"]:
+                return f"Style '{name}' not found in {key}"
+        return True
+
     def sdxlpromptstyler(self, text_positive_g, text_positive_l, text_negative, artist, movie, style,universal_neg):
         # Process and combine prompts in templates
         # The function replaces the positive prompt placeholder in the template,
         # and combines the negative prompt with the template's negative prompt, if they exist.
 
-        text_pos_g_style = ""
-        text_pos_l_style = ""
-        text_pos_style = ""
-        text_neg_style = ""
-
-        text_pos_g_artist, text_pos_l_artist, text_neg_artist = read_sdxl_templates_replace_and_combine(self.json_data_artists, artist, text_positive_g, text_positive_l, text_negative)
-
-        if(text_positive_g == text_positive_l):
-            if(text_pos_l_artist != text_positive_l and text_pos_g_artist != text_positive_g):
-                text_positive_l = ""
-                text_pos_g_artist, text_pos_l_artist, text_neg_artist = read_sdxl_templates_replace_and_combine(self.json_data_artist, artist, text_positive_g, text_positive_l, text_negative) 
-            elif(text_pos_g_artist != text_positive_g):
-                text_pos_l_artist = text_pos_g_artist
-            elif(text_pos_l_artist != text_positive_l):
-                text_pos_g_artist = text_pos_l_artist
-
-        text_pos_g_movie, text_pos_l_movie, text_neg_movie = read_sdxl_templates_replace_and_combine(self.json_data_movies, movie, text_pos_g_artist, text_pos_l_artist, text_negative)
-
-        if(text_pos_g_artist == text_pos_l_artist):
-            if(text_pos_l_movie != text_pos_l_artist and text_pos_g_movie != text_pos_g_artist):
-                text_pos_l_artist = ""
-                text_pos_g_movie, text_pos_l_movie, text_neg_movie = read_sdxl_templates_replace_and_combine(self.json_data_movie, movie, text_positive_g, text_positive_l, text_negative) 
-            elif(text_pos_g_movie != text_pos_g_artist):
-                text_pos_l_movie = text_pos_g_movie
-            elif(text_pos_l_movie != text_pos_l_artist):
-                text_pos_g_movie = text_pos_l_movie
-
-        text_pos_g_style, text_pos_l_style, text_neg_style = read_sdxl_templates_replace_and_combine(self.json_data_styles, style, text_pos_g_movie, text_pos_l_movie, text_neg_movie)
-
-        if(text_pos_g_movie == text_pos_l_movie):
-            if(text_pos_l_movie != text_pos_l_style and text_pos_g_movie != text_pos_g_style):
-                text_pos_l_movie = ""
-                text_pos_g_style, text_pos_l_style, text_neg_style = read_sdxl_templates_replace_and_combine(self.json_data_styles, style, text_pos_g_movie, text_pos_l_movie, text_neg_movie) 
-            elif(text_pos_g_movie != text_pos_g_style):
-                text_pos_l_style = text_pos_g_style
-            elif(text_pos_l_movie != text_pos_l_style):
-                text_pos_g_style = text_pos_l_style
-
-        if(text_pos_g_style != text_pos_l_style):
-            if(text_pos_l_style != ""):
-                text_pos_style = text_pos_g_style + ' . ' + text_pos_l_style
-            else:
-                text_pos_style = text_pos_g_style 
-        else:
-            text_pos_style = text_pos_g_style 
+        return style_sdxl_prompts_cached(self.style_catalogs, text_positive_g, text_positive_l, text_negative, artist, movie, style, universal_neg)
 
-        if(universal_neg == "ON"):
-            if (text_neg_style != ''):
-                text_neg_style = text_neg_style + ', text, watermark, low-quality, signature, moire pattern, downsampling, aliasing, distorted, blurry, glossy, blur, jpeg artifacts, compression artifacts, poorly drawn, low-resolution, bad, distortion, twisted, excessive, exaggerated pose, exaggerated limbs, grainy, symmetrical, duplicate, error, pattern, beginner, pixelated, fake, hyper, glitch, overexposed, high-contrast, bad-contrast'
-            else:
-                text_neg_style = 'text, watermark, low-quality, signature, moire pattern, downsampling, aliasing, distorted, blurry, glossy, blur, jpeg artifacts, compression artifacts, poorly drawn, low-resolution, bad, distortion, twisted, excessive, exaggerated pose, exaggerated limbs, grainy, symmetrical, duplicate, error, pattern, beginner, pixelated, fake, hyper, glitch, overexposed, high-contrast, bad-contrast'
+#---------------------------------------------------------------------------------------------------------------------------------------------------#
+
+class SDXL_Prompt_Styler_Batch:
+
+    def __init__(self):
+        pass
+
+    uni_neg = ["OFF","ON"]
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "text_positive_g": ("STRING", {"default": "", "multiline": True}),
+                "text_positive_l": ("STRING", {"default": "", "multiline": True}),
+                "text_negative": ("STRING", {"default": "", "multiline": True}),
+                "artists": ("STRING", {"default": "none", "multiline": True}),
+                "movies": ("STRING", {"default": "none", "multiline": True}),
+                "styles": ("STRING", {"default": "none", "multiline": True}),
+                "universal_neg": (s.uni_neg,),
+            },
+        }
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ('STRING','STRING','STRING','STRING',)
+    RETURN_NAMES = ('text_positive_g','text_positive_l','text_positive','text_negative',)
+    OUTPUT_IS_LIST = (True, True, True, True,)
+    FUNCTION = 'sdxlpromptstylerbatch'
+    CATEGORY = 'JPS Nodes/Style'
+
+    def sdxlpromptstylerbatch(self, text_positive_g, text_positive_l, text_negative, artists, movies, styles, universal_neg):
+        # Every prompt is styled with every artist x movie x style combination, in one execution.
+        # Style names are given one per line, "*" selects the whole catalog.
+        # Prompt lists of different length are aligned by repeating their last element.
+
+        style_catalogs = get_sdxl_style_catalogs()
+        artist_names = get_style_names_from_lines(artists, style_catalogs["artists"])
+        movie_names = get_style_names_from_lines(movies, style_catalogs["movies"])
+        style_names = get_style_names_from_lines(styles, style_catalogs["styles"])
+        universal_neg = universal_neg[0]
+
+        prompt_count = max(len(text_positive_g), len(text_positive_l), len(text_negative))
+        text_pos_g_list = []
+        text_pos_l_list = []
+        text_pos_list = []
+        text_neg_list = []
+
+        for i in range(prompt_count):
+            prompt_g = text_positive_g[min(i, len(text_positive_g) - 1)]
+            prompt_l = text_positive_l[min(i, len(text_positive_l) - 1)]
+            negative = text_negative[min(i, len(text_negative) - 1)]
+            for artist, movie, style in itertools.product(artist_names, movie_names, style_names):
+                text_pos_g, text_pos_l, text_pos, text_neg = style_sdxl_prompts_cached(style_catalogs, prompt_g, prompt_l, negative, artist, movie, style, universal_neg)
+                text_pos_g_list.append(text_pos_g)
+                text_pos_l_list.append(text_pos_l)
+                text_pos_list.append(text_pos)
+                text_neg_list.append(text_neg)
+
+        return text_pos_g_list, text_pos_l_list, text_pos_list, text_neg_list
+
+#---------------------------------------------------------------------------------------------------------------------------------------------------#
+
+class SDXL_Prompt_Styler_Random:
+
+    def __init__(self):
+        pass
+
+    uni_neg = ["OFF","ON"]
+    weighting = ["OFF","ON"]
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "text_positive_g": ("STRING", {"default": "", "multiline": True}),
+                "text_positive_l": ("STRING", {"default": "", "multiline": True}),
+                "text_negative": ("STRING", {"default": "", "multiline": True}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+                "batch_count": ("INT", {"default": 1, "min": 1, "max": 4096}),
+                "artist_prefix": ("STRING", {"default": ""}),
+                "movie_prefix": ("STRING", {"default": ""}),
+                "style_prefix": ("STRING", {"default": ""}),
+                "weighted": (s.weighting,),
+                "universal_neg": (s.uni_neg,),
+            },
+        }
+
+    RETURN_TYPES = ('STRING','STRING','STRING','STRING','STRING',)
+    RETURN_NAMES = ('text_positive_g','text_positive_l','text_positive','text_negative','style_names',)
+    OUTPUT_IS_LIST = (True, True, True, True, True,)
+    FUNCTION = 'sdxlpromptstylerrandom'
+    CATEGORY = 'JPS Nodes/Style'
+
+    def sdxlpromptstylerrandom(self, text_positive_g, text_positive_l, text_negative, seed, batch_count, artist_prefix, movie_prefix, style_prefix, weighted, universal_neg):
+        # Every prompt of the batch gets a random artist, movie and style, without repeats until a catalog is used up.
+        # Prefixes limit the choice to names starting with them, weighted sampling uses the optional "weight" of the templates.
+
+        style_catalogs = get_sdxl_style_catalogs()
+        rnd = random.Random(seed)
+        artists = sample_style_names(style_catalogs["artists"], rnd, batch_count, artist_prefix, weighted == "ON")
+        movies = sample_style_names(style_catalogs["movies"], rnd, batch_count, movie_prefix, weighted == "ON")
+        styles = sample_style_names(style_catalogs["styles"], rnd, batch_count, style_prefix, weighted == "ON")
 
-        return text_pos_g_style, text_pos_l_style, text_pos_style, text_neg_style
+        text_pos_g_list = []
+        text_pos_l_list = []
+        text_pos_list = []
+        text_neg_list = []
+        style_name_list = []
+
+        for artist, movie, style in zip(artists, movies, styles):
+            text_pos_g, text_pos_l, text_pos, text_neg = style_sdxl_prompts(style_catalogs, text_positive_g, text_positive_l, text_negative, artist, movie, style, universal_neg)
+            text_pos_g_list.append(text_pos_g)
+            text_pos_l_list.append(text_pos_l)
+            text_pos_list.append(text_pos)
+            text_neg_list.append(text_neg)
+            style_name_list.append(f"{artist} / {movie} / {style}")
+
+        return text_pos_g_list, text_pos_l_list, text_pos_list, text_neg_list, style_name_list
+
+#---------------------------------------------------------------------------------------------------------------------------------------------------#
+
+class SDXL_Prompt_Styler_Stack:
+
+    def __init__(self):
+        pass
+
+    uni_neg = ["OFF","ON"]
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "text_positive_g": ("STRING", {"default": "", "multiline": True}),
+                "text_positive_l": ("STRING", {"default": "", "multiline": True}),
+                "text_negative": ("STRING", {"default": "", "multiline": True}),
+                "styles": ("STRING", {"default": "artists: none\nmovies: none\nstyles: none", "multiline": True}),
+                "universal_neg": (s.uni_neg,),
+            },
+        }
+
+    RETURN_TYPES = ('STRING','STRING','STRING','STRING',)
+    RETURN_NAMES = ('text_positive_g','text_positive_l','text_positive','text_negative',)
+    FUNCTION = 'sdxlpromptstylerstack'
+    CATEGORY = 'JPS Nodes/Style'
+
+    def sdxlpromptstylerstack(self, text_positive_g, text_positive_l, text_negative, styles, universal_neg):
+        # One "catalog: name" pair per line, applied from top to bottom,
+        # so two artists and a style need one node instead of a chain of stylers.
+
+        return stack_sdxl_styles(get_sdxl_style_catalogs(), parse_style_stack(styles), text_positive_g, text_positive_l, text_negative, universal_neg)
 
 #---------------------------------------------------------------------------------------------------------------------------------------------------#    
 
+# Opt-in cache of crop node results across queue items, in MB (0 disables it).
+# Results are keyed by a fingerprint of the image content and all node inputs, so they are found again
+# when ComfyUI runs a crop node for an unchanged image because some other input of the prompt changed.
+CROP_CACHE_MB = int(os.environ.get("JPS_CROP_CACHE_MB", "0"))
+
+def get_crop_result_size(result):
+    return sum(value.element_size() * value.nelement() for value in result if isinstance(value, torch.Tensor))
+
+crop_result_cache = LRUCache(0, CROP_CACHE_MB * 1024 * 1024, get_crop_result_size)
+
+def get_image_fingerprint(image):
+    """
+    Returns a fingerprint of the shape, type and content of an image tensor.
+    The image is hashed on every call, ComfyUI passes inference tensors without a version counter to tell whether they changed.
+    Images on the GPU are copied to the host in full for hashing, on every cache lookup.
+    """
+    # SHA-1 was more than twice as fast as BLAKE2b in benchmarks/bench_crop.py, it is not used for security here
+    data = image.detach().contiguous().cpu().reshape(-1).view(torch.uint8).numpy()
+    return (tuple(image.shape), str(image.dtype), hashlib.sha1(data, usedforsecurity=False).hexdigest())
+
+def cache_crop_results(function):
+    """
+    Keeps the results of a crop node function in crop_result_cache, keyed by the image fingerprint and all other inputs.
+    Cached tensors are kept on the CPU, every call gets its own copy on the device of the image.
+    """
+    @functools.wraps(function)
+    def cached_function(self, image, *args, **kwargs):
+        if crop_result_cache.max_bytes <= 0:
+            return function(self, image, *args, **kwargs)
+
+        key = (function.__qualname__, get_image_fingerprint(image), args, tuple(sorted(kwargs.items())))
+        result = crop_result_cache.get(key)
+        if result is None:
+            result = function(self, image, *args, **kwargs)
+            crop_result_cache.put(key, tuple(value.detach().to("cpu", copy=True) if isinstance(value, torch.Tensor) else value for value in result))
+            return result
+
+        return tuple(value.to(image.device, copy=True) if isinstance(value, torch.Tensor) else value for value in result)
+    return cached_function
+
+def parse_frame_values(text, convert, default, count):
+    """
+    Returns count per-frame values from a text with one value per line or separated by commas.
+    Lists shorter than count repeat their last value, an empty text gives default for every frame.
+    """
+    values = [value.strip() for value in text.replace(',', '\n').splitlines() if value.strip()]
+    if not values:
+        return [default] * count
+
+    try:
+        values = [convert(float(value)) for value in values[:count]]
+    except ValueError:
+        raise ValueError(f"Invalid per-frame value in '{text}', expected numbers")
+    return values + values[-1:] * (count - len(values))
+
 class Crop_Image_Square:
     @classmethod
     def INPUT_TYPES(s):
@@ -2318,6 +3873,11 @@ class Crop_Image_Square:
                 "interpolation": (["lanczos", "nearest", "bilinear", "bicubic", "area", "nearest-exact"],),
                 "target_rez": ("INT", { "default": 0 , "min": 0, "step": 8, "display": "number" }),
                 "sharpening": ("FLOAT", {"default": 0.0, "min": 0, "max": 1, "step": 0.05}),
+            },
+            "optional": {
+                "offsets_x": ("STRING", {"default": "", "multiline": True}),
+                "offsets_y": ("STRING", {"default": "", "multiline": True}),
+                "zooms": ("STRING", {"default": "", "multiline": True}),
             }
         }
     
@@ -2326,8 +3886,7 @@ class Crop_Image_Square:
     FUNCTION = "crop_square"
     CATEGORY = "JPS Nodes/Image"
 
-    def crop_square(self, image, crop_position, offset_x, offset_y, zoom, interpolation, target_rez,sharpening):
-        _, h, w, _ = image.shape
+    def get_crop_window(self, h, w, crop_position, offset_x, offset_y, zoom):
         crop_size = min(h, w)
 
         offset_x = int (offset_x * zoom)
@@ -2366,31 +3925,65 @@ class Crop_Image_Square:
         elif (y + crop_size + offset_y <= int(h*zoom)):
             y = 0
 
+        return x, y
+
+    def crop_frames(self, frames, zoom, x, y, interpolation, target_rez, sharpening):
+        _, h, w, _ = frames.shape
+        crop_size = min(h, w)
         x2 = x+crop_size
         y2 = y+crop_size
 
-        zoomedimage = image[:, 0:h, 0:w, :]
+        # the crop window is resampled from the source image, without resizing the whole image first;
+        # a Lanczos resize to target_rez is done in the same pass
+        output = frames.permute([0,3,1,2])
 
-        zoomedimage = zoomedimage.permute([0,3,1,2])        
+        if target_rez != 0 and interpolation == "lanczos":
+            output = lanczos_crop(output, int(w*zoom), int(h*zoom), x, y, x2 - x, y2 - y, target_rez, target_rez)
+        else:
+            output = lanczos_crop(output, int(w*zoom), int(h*zoom), x, y, x2 - x, y2 - y)
 
-        zoomedimage = comfy.utils.lanczos(zoomedimage, int(w*zoom), int(h*zoom))
+            if target_rez != 0:
+                output = F.interpolate(output, size=(target_rez, target_rez), mode=interpolation)
 
-        zoomedimage = zoomedimage.permute([0,2,3,1])
+        if sharpening > 0:
+            output = contrast_adaptive_sharpening(output, sharpening)
 
-        output = zoomedimage[:, y:y2, x:x2, :]
+        return output.permute([0,2,3,1])
 
-        output = output.permute([0,3,1,2])
+    @cache_crop_results
+    def crop_square(self, image, crop_position, offset_x, offset_y, zoom, interpolation, target_rez,sharpening, offsets_x="", offsets_y="", zooms=""):
+        batch_size, h, w, channels = image.shape
+        crop_size = min(h, w)
 
-        if target_rez != 0:
-            if interpolation == "lanczos":
-                output = comfy.utils.lanczos(output, target_rez, target_rez)
+        # optional per-frame offsets and zooms, for example from face tracking, one value per line
+        frame_offsets_x = parse_frame_values(offsets_x, int, offset_x, batch_size)
+        frame_offsets_y = parse_frame_values(offsets_y, int, offset_y, batch_size)
+        frame_zooms = parse_frame_values(zooms, float, zoom, batch_size)
+
+        # frames with the same zoom and crop window are resampled together
+        window_groups = {}
+        for frame in range(batch_size):
+            frame_zoom = max(frame_zooms[frame], 1)
+            x, y = self.get_crop_window(h, w, crop_position, frame_offsets_x[frame], frame_offsets_y[frame], frame_zoom)
+            window_groups.setdefault((frame_zoom, x, y), []).append(frame)
+
+        # resampled columns, the output and the sharpening buffers of one frame
+        output_size = target_rez if target_rez != 0 else crop_size
+        frame_bytes = channels * image.element_size() * (2 * h * output_size + 6 * output_size * output_size)
+
+        output = None
+        for (frame_zoom, x, y), frames in window_groups.items():
+            # consecutive frames are a view of the batch, other groups are gathered
+            if frames[-1] - frames[0] == len(frames) - 1:
+                frames = slice(frames[0], frames[-1] + 1)
+            frame_images = image[frames]
+            result = map_image_chunks(lambda chunk: self.crop_frames(chunk, frame_zoom, x, y, interpolation, target_rez, sharpening), frame_images, frame_bytes)
+            if len(window_groups) == 1:
+                output = result
             else:
-                output = F.interpolate(output, size=(target_rez, target_rez), mode=interpolation)
-
-        if sharpening > 0:
-            output = contrast_adaptive_sharpening(output, sharpening)
-    
-        output = output.permute([0,2,3,1])
+                if output is None:
+                    output = torch.empty((batch_size,) + result.shape[1:], dtype=result.dtype, device=result.device)
+                output[frames] = result
 
         return(output, )
 
@@ -2416,6 +4009,7 @@ class Crop_Image_TargetSize:
     FUNCTION = "crop_targetsize"
     CATEGORY = "JPS Nodes/Image"
 
+    @cache_crop_results
     def crop_targetsize(self, image, target_w, target_h, crop_position, offset, interpolation, sharpening):
         _, current_h, current_w, _ = image.shape
 
@@ -2436,17 +4030,6 @@ class Crop_Image_TargetSize:
   #      print(new_w)
   #      print(new_h)
 
-        resized_image = image.permute([0,3,1,2])
-
-        if interpolation == "lanczos":
-            resized_image = comfy.utils.lanczos(resized_image, new_w, new_h)
-        else:
-            resized_image = F.interpolate(resized_image, size=(new_h, new_w), mode=interpolation)
-
-        resized_image = resized_image.permute([0,2,3,1])
-
-        output_image = resized_image
-
         if (crop_position == "left"):
             newoffset_w = offset_w
         elif (crop_position == "right"):
@@ -2481,15 +4064,193 @@ class Crop_Image_TargetSize:
  #       print("y: "+str(y))
  #       print("y2: "+str(y2))
 
-        if sharpening > 0:
-            output_image = contrast_adaptive_sharpening(output_image, sharpening)
+        def crop_frames(frames):
+            resized_image = frames.permute([0,3,1,2])
+
+            if interpolation == "lanczos":
+                resized_image = lanczos_resize(resized_image, new_w, new_h)
+            else:
+                resized_image = F.interpolate(resized_image, size=(new_h, new_w), mode=interpolation)
+
+            resized_image = resized_image.permute([0,2,3,1])
+
+            if sharpening > 0:
+                # only the crop and a 1 pixel halo are sharpened, so the crop gets the same result as sharpening the whole image
+                halo_y = min(y, 1)
+                halo_x = min(x, 1)
+                output_image = resized_image[:, y-halo_y:y2+1, x-halo_x:x2+1, :]
+                output_image = contrast_adaptive_sharpening(output_image.permute([0,3,1,2]), sharpening).permute([0,2,3,1])
+                return output_image[:, halo_y:halo_y+y2-y, halo_x:halo_x+x2-x, :]
 
-        output_image = output_image[:, y:y2, x:x2, :]
+            return resized_image[:, y:y2, x:x2, :]
+
+        # resampled columns, the resized image and the sharpening buffers of one frame
+        frame_bytes = image.shape[3] * image.element_size() * (2 * current_h * new_w + 2 * new_h * new_w + 5 * target_h * target_w)
+        output_image = map_image_chunks(crop_frames, image, frame_bytes)
 
         return(output_image, )
 
 #---------------------------------------------------------------------------------------------------------------------------------------------------#    
 
+def get_tile_positions(size, tile_size, overlap):
+    """
+    Returns the start of every tile along one dimension of size pixels, tiles overlap by at least overlap pixels.
+    The last tile is moved back to end at the image border.
+    """
+    stride = max(tile_size - overlap, 1)
+    positions = list(range(0, size - tile_size + 1, stride))
+    if positions[-1] != size - tile_size:
+        positions.append(size - tile_size)
+    return positions
+
+def parse_tile_windows(text, h, w):
+    """
+    Returns the square windows [(x, y, size), ...] of a text with one "x, y, size" line per window, in pixels of the source image.
+    Windows are moved inside the image like the offsets of Crop Image Square.
+    """
+    windows = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            x, y, size = [int(float(value)) for value in line.split(',')]
+        except ValueError:
+            raise ValueError(f"Invalid window '{line.strip()}', expected x, y, size")
+        size = min(max(size, 1), h, w)
+        windows.append((min(max(x, 0), w - size), min(max(y, 0), h - size), size))
+    return windows
+
+def get_tile_weights(size, feather):
+    """
+    Returns the blending weights of one tile dimension, rising linearly over feather pixels at both edges.
+    """
+    positions = torch.arange(size, dtype=torch.float32)
+    ramp = torch.minimum(positions + 1, size - positions) / (feather + 1)
+    return ramp.clamp_(max=1)
+
+class Crop_Image_Tiles:
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "image": ("IMAGE",),
+                "tile_size": ("INT", { "default": 512, "min": 8, "max": 8192, "step": 8, "display": "number" }),
+                "overlap": ("INT", { "default": 64, "min": 0, "max": 4096, "step": 8, "display": "number" }),
+                "interpolation": (["lanczos", "nearest", "bilinear", "bicubic", "area", "nearest-exact"],),
+                "target_rez": ("INT", { "default": 0 , "min": 0, "step": 8, "display": "number" }),
+                "sharpening": ("FLOAT", {"default": 0.0, "min": 0, "max": 1, "step": 0.05}),
+            },
+            "optional": {
+                "windows": ("STRING", {"default": "", "multiline": True}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE","JPS_TILES",)
+    RETURN_NAMES = ("tiles","tile_info",)
+    FUNCTION = "crop_tiles"
+    CATEGORY = "JPS Nodes/Image"
+
+    @cache_crop_results
+    def crop_tiles(self, image, tile_size, overlap, interpolation, target_rez, sharpening, windows=""):
+        batch_size, h, w, channels = image.shape
+
+        # a grid of tiles, or the windows given as "x, y, size" lines, for example several IP-Adapter crops
+        tile_windows = parse_tile_windows(windows, h, w)
+        grid_positions = None
+        if not tile_windows:
+            tile_size = min(tile_size, h, w)
+            # at most half a tile of overlap, so every pixel is in at most 2x2 tiles;
+            # an overlap close to the tile size would ask for thousands of tiles and run out of memory
+            overlap = min(overlap, tile_size // 2)
+            grid_positions = (get_tile_positions(h, tile_size, overlap), get_tile_positions(w, tile_size, overlap))
+            tile_windows = [(x, y, tile_size) for y in grid_positions[0] for x in grid_positions[1]]
+
+        sizes = set(size for _, _, size in tile_windows)
+        if target_rez == 0 and len(sizes) > 1:
+            raise ValueError("Windows of different sizes need a target_rez")
+        output_size = target_rez if target_rez != 0 else tile_size if grid_positions else sizes.pop()
+
+        stride = max(tile_size - overlap, 1)
+        strided = grid_positions is not None and output_size == tile_size and all(b - a == stride for positions in grid_positions for a, b in zip(positions, positions[1:]))
+
+        def crop_frames(frames):
+            if strided:
+                # evenly spaced tiles are strided views of the image, only the output batch is copied
+                output = frames.unfold(1, tile_size, stride).unfold(2, tile_size, stride).permute([0,1,2,4,5,3])
+                output = output.reshape(frames.shape[0], -1, tile_size, tile_size, channels)
+            else:
+                samples = frames.permute([0,3,1,2])
+                tiles = []
+                for x, y, size in tile_windows:
+                    tile = samples[:, :, y:y+size, x:x+size]
+                    if size != output_size:
+                        # only the pixels of the window are resampled, with the same math as Crop Image Square
+                        if interpolation == "lanczos":
+                            tile = lanczos_crop(samples, w, h, x, y, size, size, output_size, output_size)
+                        else:
+                            tile = F.interpolate(tile, size=(output_size, output_size), mode=interpolation)
+                    tiles.append(tile)
+                output = torch.stack(tiles, dim=1).permute([0,1,3,4,2])
+
+            if sharpening > 0:
+                output = contrast_adaptive_sharpening(output.reshape(-1, output_size, output_size, channels).permute([0,3,1,2]), sharpening)
+                output = output.permute([0,2,3,1]).reshape(frames.shape[0], -1, output_size, output_size, channels)
+
+            return output
+
+        # the tiles of one frame, their resampled columns and the sharpening buffers
+        frame_bytes = channels * image.element_size() * len(tile_windows) * (2 * h * output_size + 6 * output_size * output_size)
+        output = map_image_chunks(crop_frames, image, frame_bytes)
+
+        tile_info = {"width": w, "height": h, "windows": tile_windows, "interpolation": interpolation}
+        return(output.reshape(-1, output_size, output_size, channels), tile_info, )
+
+#---------------------------------------------------------------------------------------------------------------------------------------------------#    
+
+class Stitch_Image_Tiles:
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "tiles": ("IMAGE",),
+                "tile_info": ("JPS_TILES",),
+                "feather": ("INT", { "default": 32, "min": 0, "max": 4096, "step": 1, "display": "number" }),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("IMAGE",)
+    FUNCTION = "stitch_tiles"
+    CATEGORY = "JPS Nodes/Image"
+
+    def stitch_tiles(self, tiles, tile_info, feather):
+        h, w = tile_info["height"], tile_info["width"]
+        tile_windows = tile_info["windows"]
+        channels = tiles.shape[3]
+        tiles = tiles.reshape(-1, len(tile_windows), tiles.shape[1], tiles.shape[2], channels)
+
+        # overlapping tiles are blended with weights that fade out towards their edges, every pixel is divided by its total weight
+        output = torch.zeros((tiles.shape[0], h, w, channels), dtype=tiles.dtype, device=tiles.device)
+        total_weights = torch.zeros((h, w, 1), dtype=tiles.dtype, device=tiles.device)
+        for index, (x, y, size) in enumerate(tile_windows):
+            tile = tiles[:, index]
+            if tile.shape[1] != size:
+                tile = tile.permute([0,3,1,2])
+                if tile_info["interpolation"] == "lanczos":
+                    tile = lanczos_resize(tile, size, size)
+                else:
+                    tile = F.interpolate(tile, size=(size, size), mode=tile_info["interpolation"])
+                tile = tile.permute([0,2,3,1])
+
+            weights = get_tile_weights(size, feather).to(tiles.device, tiles.dtype)
+            weights = (weights[:, None] * weights[None, :])[:, :, None]
+            output[:, y:y+size, x:x+size].addcmul_(tile, weights)
+            total_weights[y:y+size, x:x+size] += weights
+
+        return(output.div_(total_weights.clamp_(min=1e-8)), )
+
+#---------------------------------------------------------------------------------------------------------------------------------------------------#    
+
 class Save_Images_Plus:
     def __init__(self):
         self.output_dir = folder_paths.get_output_directory()
@@ -2543,6 +4304,25 @@ class Save_Images_Plus:
 
 #---------------------------------------------------------------------------------------------------------------------------------------------------#    
 
+if STYLES_WATCH:
+    start_style_directory_watcher()
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    @PromptServer.instance.routes.get("/jps/styles/search")
+    async def search_styles_route(request):
+        catalog_key = request.rel_url.query.get("catalog") or None
+        if catalog_key is not None and catalog_key not in STYLE_CATALOG_DIRECTORIES:
+            return web.json_response({"error": f"Unknown catalog '{catalog_key}'"}, status=400)
+        try:
+            offset = max(int(request.rel_url.query.get("offset", 0)), 0)
+            limit = min(max(int(request.rel_url.query.get("limit", 50)), 1), 1000)
+        except ValueError:
+            return web.json_response({"error": "offset and limit must be integers"}, status=400)
+
+        # building the search index of a large catalog takes a while, it must not block the server's event loop
+        result = await asyncio.get_running_loop().run_in_executor(None, search_styles, request.rel_url.query.get("q", ""), catalog_key, offset, limit)
+        return web.json_response(result)
+
 NODE_CLASS_MAPPINGS = {
     "Lora Loader (JPS)": IO_Lora_Loader,
     "SDXL Resolutions (JPS)": SDXL_Resolutions,
@@ -2593,7 +4373,12 @@ NODE_CLASS_MAPPINGS = {
     "Get Image Size (JPS)": Get_Image_Size,
     "Crop Image Square (JPS)": Crop_Image_Square,
     "Crop Image TargetSize (JPS)": Crop_Image_TargetSize,
+    "Crop Image Tiles (JPS)": Crop_Image_Tiles,
+    "Stitch Image Tiles (JPS)": Stitch_Image_Tiles,
     "SDXL Prompt Styler (JPS)": SDXL_Prompt_Styler,
+    "SDXL Prompt Styler Batch (JPS)": SDXL_Prompt_Styler_Batch,
+    "SDXL Prompt Styler Random (JPS)": SDXL_Prompt_Styler_Random,
+    "SDXL Prompt Styler Stack (JPS)": SDXL_Prompt_Styler_Stack,
     "SDXL Prompt Handling (JPS)": SDXL_Prompt_Handling,
     "SDXL Prompt Handling Plus (JPS)": SDXL_Prompt_Handling_Plus,
     "Text Prompt (JPS)": Text_Prompt,